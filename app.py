@@ -1,9 +1,22 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import base64
+import heapq
+import io
+import json
+import re
+import threading
+import time
+from contextlib import nullcontext
 import numpy as np
-from resume_processing import extract_text_from_pdf, preprocess_text, rank_resumes
+from resume_processing import (rank_resumes_cascade, rank_resumes_multi, build_resume_artifacts,
+                               rank_resume_artifacts, get_job_profile, warm_up, get_model, load_timings)
+from pdf_extraction import extract_texts_parallel, DEFAULT_WORKERS, text_cache
+from text_cache import hash_bytes
+from resume_artifacts import ArtifactStore
+from job_queue import JobQueue, start_workers, restart_dead_workers, EMBEDDED_WORKERS
+from instrumentation import Recorder, recording, timer
+from results_store import RankingResult
 
 # Configure the page - must be the first Streamlit command
 st.set_page_config(
@@ -39,15 +52,233 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Load the embedding model once per server process, in the background, so the first
+# page render does not wait for it and reruns never load a second copy
+@st.cache_resource(show_spinner=False)
+def start_model_warm_up():
+    thread = threading.Thread(target=warm_up, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+@st.cache_resource(show_spinner="Loading language model...")
+def load_model():
+    start_model_warm_up().join()
+    return get_model()
+
+start_model_warm_up()
+
+# Shared job queue for background runs; embedded workers are started once per server process
+@st.cache_resource(show_spinner=False)
+def get_job_queue_resources():
+    queue = JobQueue()
+    workers = start_workers(queue.db_path, EMBEDDED_WORKERS) if EMBEDDED_WORKERS else []
+    return queue, workers
+
+def get_job_queue():
+    """Return the shared queue, restarting dead embedded workers and requeueing stalled jobs."""
+    queue, workers = get_job_queue_resources()
+    restart_dead_workers(workers, queue.db_path)
+    queue.requeue_stale()
+    return queue
+
+# Job-independent work per resume (embeddings, compressed text) by file hash. One store per server
+# process, bounded by RESUME_ARTIFACT_STORE_MB, instead of a copy in every session
+@st.cache_resource(show_spinner=False)
+def get_artifact_store():
+    return ArtifactStore()
+
+# Results page builders. Each is memoized per ranking result, so picking or
+# comparing candidates and switching tabs reuse the tables and figures instead
+# of rebuilding them. Underscored arguments are not hashed: the result id
+# already identifies the ranking they come from.
+def figure_to_png(fig):
+    """Render a figure to PNG bytes (as st.pyplot would) and free it."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=200)
+    plt.close(fig)
+    return buffer.getvalue()
+
+JOB_SEPARATOR = re.compile(r'^\s*---+\s*$', re.MULTILINE)  # Line between job descriptions in multi-job mode
+
+def split_job_descriptions(text):
+    """Split the job description box into one description per ``---`` separated block."""
+    return [part.strip() for part in JOB_SEPARATOR.split(text) if part.strip()]
+
+def job_title(job_description, max_length=60):
+    """First line of a job description, for selectors and tables."""
+    title = job_description.strip().splitlines()[0] if job_description.strip() else "Untitled job"
+    return title if len(title) <= max_length else title[:max_length - 1] + "…"
+
+def ranking_card(rank, score, name, keyword_only=False):
+    """HTML card for one candidate in the rankings list."""
+    # Calculate color based on score (green to red gradient)
+    color_r = int(max(0, 255 * (1 - score / 100)))
+    color_g = int(max(0, 255 * (score / 100)))
+    color_hex = f"#{color_r:02x}{color_g:02x}60"
+
+    return f"""
+    <div class='card' style='padding: 1.25rem; margin-bottom: 1rem; border-left: 4px solid {color_hex};'>
+        <div style='display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;'>
+            <div style='display: flex; align-items: center;'>
+                <div style='background: #E3F2FD; width: 36px; height: 36px; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 1rem;'>
+                    <span style='font-weight: bold; color: #0D47A1;'>{rank}</span>
+                </div>
+                <div>
+                    <h3 style='margin: 0; color: #2c3e50;'>{name}</h3>
+                    <div style='font-size: 0.9rem; color: #666;'>Match Score: <span style='font-weight: 600; color: {color_hex};'>{score:.1f}%</span>{" <span style='background: #FFF3E0; color: #E65100; padding: 2px 8px; border-radius: 10px; font-size: 0.75rem;'>keyword score only</span>" if keyword_only else ""}</div>
+                </div>
+            </div>
+            <div style='display: flex; gap: 0.5rem;'>
+                <button class='stButton' style='background: #E3F2FD; color: #0D47A1; border: none; padding: 0.5rem 1rem; border-radius: 6px; cursor: pointer; font-weight: 500;'>View Details</button>
+                <button class='stButton' style='background: #E8F5E9; color: #2E7D32; border: none; padding: 0.5rem 1rem; border-radius: 6px; cursor: pointer; font-weight: 500;'>Download</button>
+            </div>
+        </div>
+        <div style='width: 100%; background: #f0f0f0; border-radius: 10px; height: 8px; margin-top: 0.75rem; overflow: hidden;'>
+            <div style='width: {score}%; background: {color_hex}; height: 100%; border-radius: 10px;'></div>
+        </div>
+    </div>
+    """
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_candidate_table(result_id, _results):
+    """Ranking table in rank order, indexed by rank from 1."""
+    candidate_data = []
+    for score, idx in _results.ranked():
+        candidate_data.append({
+            'Candidate': _results.file_names[idx],
+            'Match Score': float(score),  # Ensure score is a float
+            'Experience': "5+ years",  # Placeholder - would come from actual data
+            'Skills': "Python, Machine Learning, Data Analysis",  # Placeholder
+            'Education': "Master's Degree",  # Placeholder
+            'Original_Index': idx
+        })
+    df_ranks = pd.DataFrame(candidate_data)
+    df_ranks.index = df_ranks.index + 1  # Start index from 1
+    return df_ranks
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_name_index(result_id, _results):
+    """Lowercased file names in rank order, for searching."""
+    return np.array([_results.file_names[idx].lower() for idx in _results.indices], dtype=str)
+
+def filter_candidates(scores, names, query="", min_score=0, sort_by="Rank"):
+    """Rank positions of the candidates passing the filters, in display order."""
+    mask = scores >= min_score
+    if query:
+        mask &= np.char.find(names, query.lower()) >= 0
+    positions = np.flatnonzero(mask)
+    if sort_by == "Score (low to high)":
+        positions = positions[np.argsort(scores[positions], kind="stable")]
+    elif sort_by == "Score (high to low)":
+        positions = positions[np.argsort(-scores[positions], kind="stable")]
+    elif sort_by == "File name":
+        positions = positions[np.argsort(names[positions], kind="stable")]
+    return positions
+
+def row_styles(scores, n_columns):
+    """Row background colors for the rankings table: green from 80%, amber from 60%, red below."""
+    colors = np.select([scores >= 80, scores >= 60], ['background-color: #E8F5E9', 'background-color: #FFF8E1'],
+                       default='background-color: #FFEBEE')
+    return np.repeat(colors[:, None], n_columns, axis=1)
+
+BAR_CHART_MAX = 30  # Candidates shown in the score bar chart
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_bar_chart(result_id, _df_ranks):
+    _df_ranks = _df_ranks.head(BAR_CHART_MAX)
+    fig, ax = plt.subplots(figsize=(10, max(6, len(_df_ranks) * 0.25)))
+    colors = ['#4CAF50' if x == _df_ranks['Match Score'].max() else '#2196F3' for x in _df_ranks['Match Score']]
+    bars = ax.barh(_df_ranks['Candidate'], _df_ranks['Match Score'], color=colors, height=0.6)
+
+    # Add value labels
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(width + 1, bar.get_y() + bar.get_height()/2.,
+               f'{width:.1f}%',
+               ha='left', va='center',
+               fontweight='bold')
+
+    ax.set_xlim(0, 110)
+    ax.set_xlabel('Match Score (%)', fontweight='bold')
+    ax.set_ylabel('')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    plt.tight_layout()
+    return figure_to_png(fig)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_csv(result_id, _df_ranks):
+    return _df_ranks.to_csv(index=False).encode('utf-8')
+
+def build_candidate_options(results, positions):
+    """Selectbox labels for the given rank positions only, keyed by position.
+
+    The pickers follow the filtered page of the rankings table, so a widget never
+    carries one option per ranked candidate; the search box reaches the rest.
+    """
+    return {int(position): f"#{position + 1}: {results.file_names[results.indices[position]]} "
+                           f"({results.scores[position]:.2f}%)" for position in positions}
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_best_fit_table(result_id, _job_results, _best_fit):
+    """Each candidate's highest-scoring job in a multi-job run, best match first."""
+    file_names = _job_results[0].file_names
+    df_fit = pd.DataFrame({
+        'Candidate': file_names,
+        'Best-fit Job': [f"Job {job + 1}: {job_title(_job_results[job].job_description)}" for job, _ in _best_fit],
+        'Match Score': [score for _, score in _best_fit],
+    }).sort_values('Match Score', ascending=False, kind='stable').reset_index(drop=True)
+    df_fit.index = df_fit.index + 1
+    return df_fit
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def build_radar_chart(result_id, resume_idx, match_score):
+    # Mock data for radar chart (in a real app, you'd calculate these); cached, so
+    # a candidate's chart stays the same while the ranking is on screen
+    categories = ['Technical Skills', 'Experience', 'Education', 'Soft Skills', 'Overall Match']
+    values = [
+        min(100, match_score + np.random.uniform(-10, 10)),
+        min(100, match_score + np.random.uniform(-15, 15)),
+        min(100, match_score + np.random.uniform(-5, 5)),
+        min(100, match_score + np.random.uniform(-10, 10)),
+        match_score
+    ]
+    values = [max(0, min(100, v)) for v in values]  # Ensure between 0-100
+
+    # Create radar chart
+    categories = np.array(categories)
+    N = len(categories)
+
+    angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
+    values = np.array(values)
+    values = np.concatenate((values, [values[0]]))  # Close the loop
+    angles = np.concatenate((angles, [angles[0]]))  # Close the loop
+    categories = np.concatenate((categories, [categories[0]]))  # Close the loop
+
+    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(polar=True))
+    ax.plot(angles, values, 'o-', linewidth=2, color='#1E88E5')
+    ax.fill(angles, values, alpha=0.25, color='#1E88E5')
+    ax.set_thetagrids(np.degrees(angles[:-1]), categories[:-1])
+    ax.set_ylim(0, 100)
+    ax.grid(True)
+    ax.set_title('Candidate Match Analysis', size=15)
+    return figure_to_png(fig)
+
 # Initialize session state variables if they don't exist
-if "ranked_resumes" not in st.session_state:
-    st.session_state["ranked_resumes"] = None
-if "resume_texts" not in st.session_state:
-    st.session_state["resume_texts"] = None
-if "resume_files" not in st.session_state:
-    st.session_state["resume_files"] = None
+if "results" not in st.session_state:
+    st.session_state["results"] = None  # RankingResult of the last run; texts stay on disk
 if "job_description" not in st.session_state:
     st.session_state["job_description"] = ""
+if "performance" not in st.session_state:
+    st.session_state["performance"] = None
+if "job_results" not in st.session_state:
+    # One result per job description in multi-job mode, plus each candidate's best-fit job
+    st.session_state["job_results"] = None
+    st.session_state["best_fit"] = None
+if "job_id" not in st.session_state:
+    # A background job survives a page reload through the URL
+    st.session_state["job_id"] = st.query_params.get("job")
 
 # Sidebar Navigation
 with st.sidebar:
@@ -208,6 +439,16 @@ elif page == "Upload & Process":
                 label_visibility="collapsed"
             )
             
+            multi_job = st.checkbox(
+                "Screen against several job descriptions",
+                value=False,
+                help="Separate job descriptions with a line containing only ---. Every resume is processed once "
+                     "and ranked against all of them, and each candidate gets a best-fit job."
+            )
+            job_descs = split_job_descriptions(job_desc) if multi_job else [job_desc]
+            if multi_job:
+                st.caption(f"{len(job_descs)} job description(s) found")
+            
             st.markdown("<div style='font-size: 0.85rem; color: #666; margin-top: 0.5rem;'>Tip: Be as detailed as possible for better matching results.</div>", unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
     
@@ -258,6 +499,42 @@ elif page == "Upload & Process":
             
             st.markdown("</div>", unsafe_allow_html=True)  # End of card
 
+    # Processing options
+    with st.expander("⚙️ Processing Options"):
+        extraction_workers = st.number_input(
+            "Extraction workers",
+            min_value=1,
+            max_value=max(DEFAULT_WORKERS, 32),
+            value=DEFAULT_WORKERS,
+            step=1,
+            help="Number of processes used to extract text from PDFs in parallel"
+        )
+        cascade_top_m = st.number_input(
+            "Semantic shortlist size",
+            min_value=0,
+            value=0,
+            step=50,
+            help="Only the top N resumes by keyword/TF-IDF score get full semantic scoring. 0 scores everyone. "
+                 "Not used when screening against several job descriptions."
+        )
+        run_in_background = st.checkbox(
+            "Run as a background job",
+            value=False,
+            help="Queue the run for the shared workers; it keeps going if you close or reload the page. "
+                 "Single job description only."
+        )
+        record_timings = st.checkbox(
+            "Record stage timings",
+            value=False,
+            help="Time each processing stage and show the breakdown in a Performance panel on the Results page"
+        )
+        timings = [f"module import {load_timings['import'] * 1000:.0f} ms"]
+        if 'stopwords' in load_timings:
+            timings.append(f"stopwords {load_timings['stopwords']:.2f} s")
+        if 'model' in load_timings:
+            timings.append(f"model load {load_timings['model']:.2f} s")
+        st.caption("⏱️ Startup: " + " · ".join(timings))
+
     # Process button with improved styling
     st.markdown("<div style='margin: 2rem 0;'>", unsafe_allow_html=True)
     
@@ -268,7 +545,7 @@ elif page == "Upload & Process":
         process_clicked = st.button(
             "🚀 Process Resumes", 
             type="primary", 
-            disabled=(not uploaded_files or not job_desc),
+            disabled=(not uploaded_files or not job_desc or not job_descs),
             use_container_width=True,
             help="Analyze and rank the uploaded resumes"
         )
@@ -284,8 +561,18 @@ elif page == "Upload & Process":
     
     st.markdown("</div>", unsafe_allow_html=True)
     
+    # Queue a background job instead of processing in this session
+    if process_clicked and uploaded_files and job_desc.strip() and run_in_background and not multi_job:
+        job_id = get_job_queue().submit(
+            job_desc,
+            [(file.name, file.getvalue()) for file in uploaded_files],
+            {"cascade_top_m": int(cascade_top_m) or None, "record_timings": record_timings},
+        )
+        st.session_state["job_id"] = job_id
+        st.query_params["job"] = job_id
+    
     # Process resumes when button is clicked
-    if process_clicked and uploaded_files and job_desc.strip():
+    elif process_clicked and uploaded_files and job_desc.strip():
         # Create a progress container
         progress_container = st.container()
         
@@ -300,47 +587,148 @@ elif page == "Upload & Process":
             # Create a placeholder for file processing status
             file_status = st.empty()
             
-            # Initialize lists to store results
+            # Read the uploads once so they can be handed to worker processes
+            files = [(file.name, file.getvalue()) for file in uploaded_files]
             resume_texts = []
             file_names = []
+            counts = {"cached": 0, "reused": 0}
             
-            # Process each file
-            for i, file in enumerate(uploaded_files):
-                try:
-                    # Update status
-                    progress_text = f"Processing {i+1} of {len(uploaded_files)}: {file.name}"
-                    progress_bar.progress((i) / len(uploaded_files), text=progress_text)
+            def extracted_texts(pending=files):
+                """Yield extraction results as files finish, updating the per-file status."""
+                extraction = extract_texts_parallel(pending, max_workers=int(extraction_workers))
+                done = 0
+                while True:
+                    with timer("pdf.extract"):  # Time spent waiting on extraction workers
+                        result = next(extraction, None)
+                    if result is None:
+                        break
+                    done += 1
                     
-                    # Extract text from PDF
-                    with st.spinner(f"Extracting text from {file.name}..."):
-                        text = extract_text_from_pdf(file)
+                    # Update progress
+                    progress_bar.progress(done / len(pending), text=f"Processed {done} of {len(pending)} resumes")
                     
-                    if not text.strip():
-                        file_status.warning(f"⚠️ No text found in {file.name}. It may be a scanned PDF.")
+                    if result.error:
+                        file_status.error(f"❌ Error processing {result.name}: {result.error}")
+                        continue  # Skip the failed file
+                    if not result.text.strip():
+                        file_status.warning(f"⚠️ No text found in {result.name}. It may be a scanned PDF.")
                     else:
-                        file_status.success(f"✅ Processed: {file.name}")
+                        file_status.success(f"✅ Processed: {result.name}")
                     
-                    resume_texts.append(text)
-                    file_names.append(file.name)
+                    resume_texts.append(result.text)
+                    file_names.append(result.name)
+                    counts["cached"] += result.cached
+                    yield result
+            
+            # Extract text in parallel; results arrive in the order files finish
+            stage_timings = recording("app") if record_timings else nullcontext()
+            with stage_timings as recorder:
+                progress_bar.progress(0.0, text=f"Extracting text from {len(files)} resumes...")
+                if multi_job:
+                    # All jobs are scored in one pass once every resume is in
+                    for _ in extracted_texts():
+                        pass
+                    if resume_texts:
+                        load_model()
+                        with st.spinner(f"Ranking resumes against {len(job_descs)} job descriptions..."):
+                            job_rankings, best_fit = rank_resumes_multi(job_descs, resume_texts)
+                        ranked_resumes, lexical_only = job_rankings[0], set()
+                elif cascade_top_m:
+                    # The cascade needs every resume before it can pick a shortlist
+                    for _ in extracted_texts():
+                        pass
+                    if resume_texts:
+                        # Make sure the shared model has finished loading
+                        load_model()
+                        with st.spinner("Analyzing and ranking resumes..."):
+                            ranked_resumes, lexical_only = rank_resumes_cascade(job_desc, resume_texts, int(cascade_top_m))
+                else:
+                    # Files seen in earlier runs reuse their artifacts; only new files are extracted
+                    # and embedded, and a changed job description only re-encodes the job
+                    artifact_store = get_artifact_store()
+                    digests = [hash_bytes(data) for _, data in files]
+                    artifacts = []  # Reused ones, in upload order
+                    pending, pending_digests = [], []
+                    for (name, data), digest in zip(files, digests):
+                        stored = artifact_store.get(digest)
+                        if stored is not None:
+                            artifacts.append(stored)
+                            resume_texts.append(stored.text)
+                            file_names.append(name)
+                        else:
+                            pending.append((name, data))
+                            pending_digests.append(digest)
+                    counts["reused"] = len(artifacts)
+                    job_profile = get_job_profile(job_desc)
                     
-                    # Update progress
-                    progress = (i + 1) / len(uploaded_files)
-                    progress_bar.progress(progress, text=f"Processed {i+1} of {len(uploaded_files)} resumes")
+                    # Score resumes batch by batch while extraction continues, with a live leaderboard
+                    leaderboard = st.empty()
+                    scored = []
+                    batch = []
                     
-                except Exception as e:
-                    file_status.error(f"❌ Error processing {file.name}: {str(e)}")
-                    continue  # Skip the failed file
+                    def score_batch(batch_artifacts):
+                        offset = len(scored)
+                        scored.extend((score, offset + idx) for score, idx in
+                                      rank_resume_artifacts(job_desc, batch_artifacts, job_profile=job_profile))
+                        top = heapq.nlargest(10, scored, key=lambda x: (x[0], -x[1]))
+                        with timer("render.leaderboard"):
+                            leaderboard.dataframe(
+                                pd.DataFrame({
+                                    "Candidate": [file_names[idx] for _, idx in top],
+                                    "Match Score": [float(score) for score, _ in top],
+                                }),
+                                column_config={
+                                    "Match Score": st.column_config.ProgressColumn(
+                                        "Match Score", format="%.1f%%", min_value=0, max_value=100
+                                    )
+                                },
+                                hide_index=True,
+                                use_container_width=True
+                            )
+                    
+                    def add_batch():
+                        new_artifacts = build_resume_artifacts([result.text for result in batch],
+                                                               keys=[pending_digests[result.index] for result in batch])
+                        artifact_store.put_many(new_artifacts)
+                        score_batch(new_artifacts)
+                        batch.clear()
+                    
+                    if artifacts:
+                        score_batch(artifacts)
+                    for result in extracted_texts(pending):
+                        batch.append(result)
+                        if len(batch) >= 64:
+                            add_batch()
+                    if batch:
+                        add_batch()
+                    ranked_resumes = sorted(scored, key=lambda x: x[0], reverse=True)
+                    lexical_only = set()
+            
+            # Reuse statistics for this run
+            if counts["reused"]:
+                st.caption(f"♻️ {counts['reused']} of {len(files)} resumes reused from earlier runs; "
+                           f"only {len(files) - counts['reused']} new file(s) extracted and embedded")
+            if text_cache is not None:
+                cache_stats = text_cache.stats()
+                st.caption(
+                    f"📦 Text cache: {counts['cached']} of {len(files) - counts['reused']} extracted files reused, "
+                    f"{len(files) - counts['reused'] - counts['cached']} parsed · "
+                    f"{cache_stats['entries']} entries ({cache_stats['bytes'] / (1024 * 1024):.1f} MB) on disk"
+                )
             
             if resume_texts:
-                # Rank the resumes
-                with st.spinner("Analyzing and ranking resumes..."):
-                    ranked_resumes = rank_resumes(job_desc, resume_texts)
-                
-                # Save to session state
-                st.session_state["ranked_resumes"] = ranked_resumes
-                st.session_state["resume_texts"] = resume_texts
-                st.session_state["resume_files"] = file_names
+                # Save to session state; the raw texts go to disk
+                results = RankingResult.create(job_descs[0], ranked_resumes, file_names, resume_texts, lexical_only)
+                st.session_state["results"] = results
+                if multi_job:
+                    st.session_state["job_results"] = [results] + [
+                        results.with_ranking(desc, ranking) for desc, ranking in zip(job_descs[1:], job_rankings[1:])
+                    ]
+                    st.session_state["best_fit"] = best_fit
+                else:
+                    st.session_state["job_results"] = st.session_state["best_fit"] = None
                 st.session_state["job_description"] = job_desc
+                st.session_state["performance"] = recorder.to_dict() if recorder else None
                 
                 # Show completion message
                 progress_bar.progress(100, "Analysis complete!")
@@ -369,6 +757,46 @@ elif page == "Upload & Process":
                 st.error("❌ No valid resumes were processed. Please check the uploaded files and try again.")
                 
             st.markdown("</div>", unsafe_allow_html=True)  # Close card
+    
+    # Background job status
+    if st.session_state.get("job_id"):
+        job_id = st.session_state["job_id"]
+        job_queue = get_job_queue()
+        job = job_queue.status(job_id)
+        
+        st.markdown("<div class='card' style='padding: 1.5rem;'>", unsafe_allow_html=True)
+        st.markdown("<h3 style='color: #2c3e50; margin-bottom: 1rem;'>🕒 Background Job</h3>", unsafe_allow_html=True)
+        if job is None:
+            st.warning(f"Job {job_id} was not found.")
+            st.session_state["job_id"] = None
+            st.query_params.pop("job", None)
+        elif job["status"] in ("queued", "running"):
+            total = max(job["progress_total"], 1)
+            label = "Waiting for a worker..." if job["status"] == "queued" else \
+                f"Processed {job['progress_done']} of {job['progress_total']} resumes"
+            st.progress(min(job["progress_done"] / total, 1.0), text=label)
+            st.caption(f"Job id: {job_id} · you can leave this page and come back later")
+            # Poll until the job finishes
+            time.sleep(2)
+            st.rerun()
+        elif job["status"] == "failed":
+            st.error(f"❌ Job failed: {job['error']}")
+        else:
+            if st.session_state.get("loaded_job_id") != job_id:
+                result = job_queue.result(job_id)
+                st.session_state["results"] = RankingResult.create(
+                    result["job_description"], result["ranked_resumes"], result["resume_files"],
+                    result["resume_texts"], result["lexical_only"], result_id=job_id
+                )
+                st.session_state["job_results"] = st.session_state["best_fit"] = None
+                st.session_state["job_description"] = result["job_description"]
+                st.session_state["performance"] = result.get("performance")
+                st.session_state["loaded_job_id"] = job_id
+                for error in result["errors"]:
+                    st.error(f"❌ Error processing {error['name']}: {error['error']}")
+            st.success(f"✅ Job complete: {len(st.session_state['results'])} resumes ranked. "
+                       "View them on the Results page.")
+        st.markdown("</div>", unsafe_allow_html=True)  # Close card
 
 
 # Results Page
@@ -390,11 +818,11 @@ elif page == "Results":
         </div>
     </div>
     """.format(
-        len(st.session_state.get("resume_files", [])), 
-        'resume' if len(st.session_state.get("resume_files", [])) == 1 else 'resumes'
+        len(st.session_state.get("results") or ()), 
+        'resume' if len(st.session_state.get("results") or ()) == 1 else 'resumes'
     ), unsafe_allow_html=True)
 
-    if st.session_state.get("ranked_resumes") is None:
+    if st.session_state.get("results") is None:
         st.warning("""
         <div style='background-color: #FFF3E0; border-left: 5px solid #FFA000; padding: 1rem; border-radius: 4px;'>
             <div style='display: flex; align-items: center;'>
@@ -411,27 +839,43 @@ elif page == "Results":
             st.session_state.page = "Upload & Process"
             st.experimental_rerun()
     else:
-        ranked_resumes = st.session_state["ranked_resumes"]
-        resume_texts = st.session_state["resume_texts"]
-        file_names = st.session_state["resume_files"]
-        
-        # Validate that all indices in ranked_resumes are within bounds
-        valid_ranked_resumes = []
-        for score, idx in ranked_resumes:
-            if 0 <= idx < len(file_names):
-                valid_ranked_resumes.append((score, idx))
-            else:
-                st.warning(f"Warning: Skipping invalid resume index {idx} (out of bounds)")
+        results = st.session_state["results"]
+        job_results = st.session_state.get("job_results")
+        if job_results and len(job_results) > 1:
+            # Multi-job run: pick which job's ranking to show
+            job_choice = st.selectbox(
+                "Job description",
+                range(len(job_results)),
+                format_func=lambda j: f"Job {j + 1}: {job_title(job_results[j].job_description)}",
+                key="results_job"
+            )
+            results = job_results[job_choice]
+            with st.expander("🎯 Best-fit job per candidate"):
+                st.dataframe(
+                    build_best_fit_table(job_results[0].result_id, job_results, st.session_state["best_fit"]),
+                    column_config={
+                        "Match Score": st.column_config.ProgressColumn(
+                            "Match Score", format="%.1f%%", min_value=0, max_value=100
+                        )
+                    },
+                    use_container_width=True
+                )
+        result_id = results.result_id
+        file_names = results.file_names
         
-        if not valid_ranked_resumes:
+        if not len(results):
             st.error("No valid resume data to display. Please check your input files and try again.")
             st.stop()
-            
-        ranked_resumes = valid_ranked_resumes
+        
+        # Time this page's rendering too when the last run recorded stage timings
+        render_recorder = Recorder("render") if st.session_state.get("performance") else None
+        
+        def render_timer(name):
+            return render_recorder.timer(name) if render_recorder else nullcontext()
         
         # Create tabs for different views
         tab1, tab2, tab3 = st.tabs(["📊 Overview", "👥 Candidate Details", "📄 Resume Content"])
-        job_desc = st.session_state["job_description"]
+        job_desc = results.job_description
         
         with tab1:
             st.markdown("""
@@ -441,46 +885,41 @@ elif page == "Results":
             </div>
             """, unsafe_allow_html=True)
             
-            # Create a row for each candidate with a progress bar
-            for idx, (score, text_idx) in enumerate(ranked_resumes):
-                # Convert index to integer and ensure it's within bounds
-                try:
-                    text_idx_int = int(round(float(text_idx)))  # Convert numpy.float32 to Python float then to int
-                    if not (0 <= text_idx_int < len(file_names)):
-                        st.warning(f"Skipping out-of-bounds resume index {text_idx}")
-                        continue
-                except (ValueError, TypeError) as e:
-                    st.warning(f"Skipping invalid resume index {text_idx}: {str(e)}")
-                    continue
-                    
-                # Calculate color based on score (green to red gradient)
-                color_r = int(max(0, 255 * (1 - score / 100)))
-                color_g = int(max(0, 255 * (score / 100)))
-                color_hex = f"#{color_r:02x}{color_g:02x}60"
-                
-                with st.container():
-                    st.markdown(f"""
-                    <div class='card' style='padding: 1.25rem; margin-bottom: 1rem; border-left: 4px solid {color_hex};'>
-                        <div style='display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;'>
-                            <div style='display: flex; align-items: center;'>
-                                <div style='background: #E3F2FD; width: 36px; height: 36px; border-radius: 50%; display: flex; align-items: center; justify-content: center; margin-right: 1rem;'>
-                                    <span style='font-weight: bold; color: #0D47A1;'>{idx + 1}</span>
-                                </div>
-                                <div>
-                                    <h3 style='margin: 0; color: #2c3e50;'>{file_names[text_idx_int] if 0 <= text_idx_int < len(file_names) else f'Unknown ({text_idx})'}</h3>
-                                    <div style='font-size: 0.9rem; color: #666;'>Match Score: <span style='font-weight: 600; color: {color_hex};'>{score:.1f}%</span></div>
-                                </div>
-                            </div>
-                            <div style='display: flex; gap: 0.5rem;'>
-                                <button class='stButton' style='background: #E3F2FD; color: #0D47A1; border: none; padding: 0.5rem 1rem; border-radius: 6px; cursor: pointer; font-weight: 500;'>View Details</button>
-                                <button class='stButton' style='background: #E8F5E9; color: #2E7D32; border: none; padding: 0.5rem 1rem; border-radius: 6px; cursor: pointer; font-weight: 500;'>Download</button>
-                            </div>
-                        </div>
-                        <div style='width: 100%; background: #f0f0f0; border-radius: 10px; height: 8px; margin-top: 0.75rem; overflow: hidden;'>
-                            <div style='width: {score}%; background: {color_hex}; height: 100%; border-radius: 10px;'></div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
+            # Filter, sort and page on the server; only the visible page is built and sent
+            scores, indices = results.scores, results.indices
+            names = build_name_index(result_id, results)
+            filter_cols = st.columns([3, 2, 2, 1])
+            with filter_cols[0]:
+                name_query = st.text_input("Search candidates", placeholder="File name contains...", key="rank_query")
+            with filter_cols[1]:
+                min_score = st.slider("Minimum match score", 0, 100, 0, key="rank_min_score")
+            with filter_cols[2]:
+                sort_by = st.selectbox("Sort by", ["Rank", "Score (high to low)", "Score (low to high)", "File name"],
+                                       key="rank_sort")
+            with filter_cols[3]:
+                page_size = st.selectbox("Per page", [10, 25, 50, 100], index=1, key="rank_page_size")
+            
+            positions = filter_candidates(scores, names, name_query, min_score, sort_by)
+            page_count = max(1, -(-len(positions) // page_size))
+            if st.session_state.get("rank_page", 1) > page_count:
+                st.session_state["rank_page"] = 1  # The filters shrank the list below the current page
+            page_number = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1,
+                                          key="rank_page")
+            page_positions = positions[(page_number - 1) * page_size:page_number * page_size]
+            if len(positions):
+                st.caption(f"Showing {(page_number - 1) * page_size + 1}–{(page_number - 1) * page_size + len(page_positions)} "
+                           f"of {len(positions)} matching candidates ({len(scores)} ranked)")
+            else:
+                st.info("No candidates match these filters.")
+            # Picker labels for this page, shared by the compare, details and content widgets
+            candidate_options = build_candidate_options(results, page_positions)
+            
+            # Create a row for each candidate on this page with a progress bar
+            with render_timer("render.ranking_cards"):
+                for position in page_positions:
+                    with st.container():
+                        st.markdown(ranking_card(position + 1, scores[position], file_names[indices[position]],
+                                                 bool(results.lexical_only[indices[position]])), unsafe_allow_html=True)
             
             # Add summary statistics
             st.markdown("""
@@ -507,11 +946,12 @@ elif page == "Results":
                 </div>
             </div>
             """.format(
-                sum(score for score, _ in ranked_resumes) / len(ranked_resumes) if ranked_resumes else 0,
-                ranked_resumes[0][0] if ranked_resumes else 0,
-                len(ranked_resumes)
+                scores.mean() if len(scores) else 0,
+                scores.max() if len(scores) else 0,
+                len(scores)
             ), unsafe_allow_html=True)
             
+
             # Add a section for actions
             st.markdown("""
             <div style='margin: 2rem 0; text-align: center;'>
@@ -540,90 +980,42 @@ elif page == "Results":
             </div>
             """, unsafe_allow_html=True)
             
-            # Prepare enhanced data for visualization with safe access to file_names
-            candidate_data = []
-            for score, idx in ranked_resumes:
-                try:
-                    idx_int = int(round(float(idx)))  # Convert to int safely
-                    candidate_name = file_names[idx_int] if 0 <= idx_int < len(file_names) else f"Unknown ({idx})"
-                    candidate_data.append({
-                        'Candidate': candidate_name,
-                        'Match Score': float(score),  # Ensure score is a float
-                        'Experience': "5+ years",  # Placeholder - would come from actual data
-                        'Skills': "Python, Machine Learning, Data Analysis",  # Placeholder
-                        'Education': "Master's Degree",  # Placeholder
-                        'Original_Index': idx_int
-                    })
-                except (ValueError, TypeError) as e:
-                    st.warning(f"Skipping invalid resume index {idx}: {str(e)}")
-                    continue
-            
-            if not candidate_data:
-                st.error("No valid resume data to display. Please check your input files and try again.")
-                st.stop()
-                
-            df_ranks = pd.DataFrame(candidate_data)
-
-            # Sort by match score
-            df_ranks = df_ranks.sort_values('Match Score', ascending=False).reset_index(drop=True)
-            df_ranks.index = df_ranks.index + 1  # Start index from 1
+            # Ranking table, built once per result
+            df_ranks = build_candidate_table(result_id, results)
 
             # Single column layout for the bar chart
-            fig, ax = plt.subplots(figsize=(10, 6))
-            colors = ['#4CAF50' if x == df_ranks['Match Score'].max() else '#2196F3' for x in df_ranks['Match Score']]
-            bars = ax.barh(df_ranks['Candidate'], df_ranks['Match Score'], color=colors, height=0.6)
-            
-            # Add value labels
-            for bar in bars:
-                width = bar.get_width()
-                ax.text(width + 1, bar.get_y() + bar.get_height()/2.,
-                       f'{width:.1f}%',
-                       ha='left', va='center',
-                       fontweight='bold')
-            
-            ax.set_xlim(0, 110)
-            ax.set_xlabel('Match Score (%)', fontweight='bold')
-            ax.set_ylabel('')
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_visible(False)
-            plt.tight_layout()
-            st.pyplot(fig, use_container_width=True)
+            with render_timer("render.bar_chart"):
+                st.image(build_bar_chart(result_id, df_ranks), use_container_width=True)
+                if len(df_ranks) > BAR_CHART_MAX:
+                    st.caption(f"Top {BAR_CHART_MAX} of {len(df_ranks)} candidates")
 
             # Display results as an interactive table
             st.markdown("### 📊 Candidate Rankings")
             
-            # Define a function to style the DataFrame
-            def highlight_rows(row):
-                score = row['Match Score']
-                if score >= 80:
-                    return ['background-color: #E8F5E9'] * len(row)
-                elif score >= 60:
-                    return ['background-color: #FFF8E1'] * len(row)
-                else:
-                    return ['background-color: #FFEBEE'] * len(row)
-            
-            # Apply styling to the DataFrame
-            styled_df = df_ranks[['Candidate', 'Match Score', 'Experience', 'Skills']].style.apply(highlight_rows, axis=1)
+            # Apply styling to the rows of the current page only
+            with render_timer("render.rankings_table"):
+                table = df_ranks.iloc[page_positions][['Candidate', 'Match Score', 'Experience', 'Skills']]
+                page_styles = row_styles(scores[page_positions], len(table.columns))
+                styled_df = table.style.apply(lambda _: page_styles, axis=None)
             
-            # Display the styled DataFrame
-            st.dataframe(
-                styled_df,
-                column_config={
-                    "Match Score": st.column_config.ProgressColumn(
-                        "Match Score",
-                        help="Match score with job description",
-                        format="%f%%",
-                        min_value=0,
-                        max_value=100,
-                    ),
-                    "Candidate": "Candidate",
-                    "Experience": "Experience",
-                    "Skills": st.column_config.Column("Key Skills", width="large")
-                },
-                hide_index=True,
-                use_container_width=True
-            )
+                # Display the styled DataFrame
+                st.dataframe(
+                    styled_df,
+                    column_config={
+                        "Match Score": st.column_config.ProgressColumn(
+                            "Match Score",
+                            help="Match score with job description",
+                            format="%f%%",
+                            min_value=0,
+                            max_value=100,
+                        ),
+                        "Candidate": "Candidate",
+                        "Experience": "Experience",
+                        "Skills": st.column_config.Column("Key Skills", width="large")
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
             
             # Add a section for candidate actions
             st.markdown("---")
@@ -634,11 +1026,9 @@ elif page == "Results":
             
             with action_cols[0]:
                 if st.button("📤 Export All Results", use_container_width=True):
-                    # Convert DataFrame to CSV
-                    csv = df_ranks.to_csv(index=False).encode('utf-8')
                     st.download_button(
                         label="💾 Download as CSV",
-                        data=csv,
+                        data=build_csv(result_id, df_ranks),
                         file_name="candidate_rankings.csv",
                         mime="text/csv",
                         use_container_width=True
@@ -659,126 +1049,85 @@ elif page == "Results":
             st.markdown("---")
             st.markdown("### 🔍 Compare Candidates")
             
-            # Allow selecting multiple candidates for comparison
-            candidate_options = [f"{name} ({score:.1f}%)" for name, score in 
-                              zip(df_ranks['Candidate'], df_ranks['Match Score'])]
-            
-            selected_candidates = st.multiselect(
-                "Select up to 3 candidates to compare:",
-                options=candidate_options,
-                default=candidate_options[:min(3, len(candidate_options))],
-                max_selections=3,
-                placeholder="Select candidates..."
-            )
-            
-            if selected_candidates:
-                # Create a comparison table
-                st.markdown("#### Comparison Summary")
-                
-                # Extract selected candidate data
-                selected_data = []
-                for candidate in selected_candidates:
-                    name = candidate.split(' (')[0]
-                    candidate_info = df_ranks[df_ranks['Candidate'] == name].iloc[0]
-                    selected_data.append(candidate_info)
-                
-                # Display comparison
-                comparison_cols = st.columns(len(selected_data))
+            # Changing the selection only reruns this fragment, not the whole page
+            @st.fragment
+            def compare_candidates():
+                # Allow selecting multiple candidates for comparison, from the current page
+                selected_candidates = st.multiselect(
+                    "Select up to 3 candidates to compare:",
+                    options=list(candidate_options),
+                    default=list(candidate_options)[:3],
+                    format_func=candidate_options.get,
+                    max_selections=3,
+                    placeholder="Select candidates..."
+                )
                 
-                for idx, (col, candidate) in enumerate(zip(comparison_cols, selected_data)):
-                    with col:
-                        st.markdown(f"""
-                        <div style='background: #f5f9ff; border-radius: 10px; padding: 1.5rem; text-align: center; height: 100%;'>
-                            <div style='font-size: 2rem; margin-bottom: 1rem;'>
-                                {['🥇', '🥈', '🥉'][idx] if idx < 3 else '👤'}
-                            </div>
-                            <h3 style='margin: 0 0 0.5rem 0; color: #1E88E5;'>{candidate['Candidate']}</h3>
-                            <div style='font-size: 1.8rem; font-weight: bold; color: #0D47A1; margin-bottom: 1rem;'>
-                                {candidate['Match Score']:.1f}%
-                            </div>
-                            <div style='text-align: left; margin-top: 1rem;'>
-                                <p style='margin: 0.5rem 0;'><strong>Experience:</strong> {candidate['Experience']}</p>
-                                <p style='margin: 0.5rem 0;'><strong>Education:</strong> {candidate['Education']}</p>
-                                <p style='margin: 0.5rem 0;'><strong>Key Skills:</strong> {candidate['Skills']}</p>
+                if selected_candidates:
+                    # Create a comparison table
+                    st.markdown("#### Comparison Summary")
+                    
+                    # Extract selected candidate data; df_ranks rows are in rank order
+                    selected_data = [df_ranks.iloc[position] for position in selected_candidates]
+                    
+                    # Display comparison
+                    comparison_cols = st.columns(len(selected_data))
+                    
+                    for idx, (col, candidate) in enumerate(zip(comparison_cols, selected_data)):
+                        with col:
+                            st.markdown(f"""
+                            <div style='background: #f5f9ff; border-radius: 10px; padding: 1.5rem; text-align: center; height: 100%;'>
+                                <div style='font-size: 2rem; margin-bottom: 1rem;'>
+                                    {['🥇', '🥈', '🥉'][idx] if idx < 3 else '👤'}
+                                </div>
+                                <h3 style='margin: 0 0 0.5rem 0; color: #1E88E5;'>{candidate['Candidate']}</h3>
+                                <div style='font-size: 1.8rem; font-weight: bold; color: #0D47A1; margin-bottom: 1rem;'>
+                                    {candidate['Match Score']:.1f}%
+                                </div>
+                                <div style='text-align: left; margin-top: 1rem;'>
+                                    <p style='margin: 0.5rem 0;'><strong>Experience:</strong> {candidate['Experience']}</p>
+                                    <p style='margin: 0.5rem 0;'><strong>Education:</strong> {candidate['Education']}</p>
+                                    <p style='margin: 0.5rem 0;'><strong>Key Skills:</strong> {candidate['Skills']}</p>
+                                </div>
                             </div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                            """, unsafe_allow_html=True)
+            
+            compare_candidates()
 
-            # Download results as CSV
-            csv = df_ranks.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()
-            href = f'<a href="data:file/csv;base64,{b64}" download="resume_rankings.csv">Download Rankings as CSV</a>'
-            st.markdown(href, unsafe_allow_html=True)
+            # Download results as CSV; served as a file rather than inlined into the page
+            st.download_button(
+                "Download Rankings as CSV",
+                data=build_csv(result_id, df_ranks),
+                file_name="resume_rankings.csv",
+                mime="text/csv"
+            )
 
         with tab2:
             st.markdown("### Detailed Candidate Analysis")
 
-            # Create a selectbox to choose a candidate with safe indexing
-            candidate_options = []
-            valid_indices = []
-            for i, (score, idx) in enumerate(ranked_resumes):
-                try:
-                    idx_int = int(round(float(idx)))
-                    if 0 <= idx_int < len(file_names):
-                        candidate_options.append(f"#{i + 1}: {file_names[idx_int]} ({float(score):.2f}%)")
-                        valid_indices.append((float(score), idx_int))
-                    else:
-                        st.warning(f"Skipping out-of-bounds resume index {idx}")
-                except (ValueError, TypeError) as e:
-                    st.warning(f"Skipping invalid resume index {idx}: {str(e)}")
-            
-            if not candidate_options:
-                st.error("No valid candidates to display. Please check your input files and try again.")
-                st.stop()
-                
-            selected_candidate = st.selectbox("Select Candidate", candidate_options)
+            # Picking a candidate only reruns this fragment
+            @st.fragment
+            def candidate_details():
+                if not candidate_options:
+                    st.info("No candidates match the Overview filters.")
+                    return
+                selected_position = st.selectbox("Select Candidate", list(candidate_options),
+                                                 format_func=candidate_options.get)
+                st.caption("Candidates from the current Overview page; search there to find others.")
 
-            # Get the selected candidate index
-            selected_idx = candidate_options.index(selected_candidate)
-            if 0 <= selected_idx < len(valid_indices):
-                match_score, resume_idx = valid_indices[selected_idx]
-            else:
-                st.error("Invalid selection. Please try again.")
-                st.stop()
-
-            # Display candidate information
-            st.markdown(f"**Selected Candidate**: {file_names[resume_idx]}")
-            st.markdown(f"**Match Score**: {match_score:.2f}%")
-
-            # Create a radar chart for visualizing match in different areas
-            # This is a mockup - in a real application, you'd want to break down
-            # the match score into different categories
-
-            # Mock data for radar chart (in a real app, you'd calculate these)
-            categories = ['Technical Skills', 'Experience', 'Education', 'Soft Skills', 'Overall Match']
-            values = [
-                min(100, match_score + np.random.uniform(-10, 10)),
-                min(100, match_score + np.random.uniform(-15, 15)),
-                min(100, match_score + np.random.uniform(-5, 5)),
-                min(100, match_score + np.random.uniform(-10, 10)),
-                match_score
-            ]
-            values = [max(0, min(100, v)) for v in values]  # Ensure between 0-100
-
-            # Create radar chart
-            categories = np.array(categories)
-            N = len(categories)
-
-            angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
-            values = np.array(values)
-            values = np.concatenate((values, [values[0]]))  # Close the loop
-            angles = np.concatenate((angles, [angles[0]]))  # Close the loop
-            categories = np.concatenate((categories, [categories[0]]))  # Close the loop
-
-            fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(polar=True))
-            ax.plot(angles, values, 'o-', linewidth=2, color='#1E88E5')
-            ax.fill(angles, values, alpha=0.25, color='#1E88E5')
-            ax.set_thetagrids(np.degrees(angles[:-1]), categories[:-1])
-            ax.set_ylim(0, 100)
-            ax.grid(True)
-            ax.set_title('Candidate Match Analysis', size=15)
-
-            st.pyplot(fig)
+                # Get the selected candidate index
+                match_score, resume_idx = scores[selected_position], indices[selected_position]
+
+                # Display candidate information
+                st.markdown(f"**Selected Candidate**: {file_names[resume_idx]}")
+                st.markdown(f"**Match Score**: {match_score:.2f}%")
+
+                # Create a radar chart for visualizing match in different areas
+                # This is a mockup - in a real application, you'd want to break down
+                # the match score into different categories
+                with render_timer("render.radar_chart"):
+                    st.image(build_radar_chart(result_id, resume_idx, match_score), use_container_width=True)
+
+            candidate_details()
 
             # Key highlights section
             st.markdown("### Key Highlights")
@@ -805,54 +1154,36 @@ elif page == "Results":
         with tab3:
             st.markdown("### Resume Content")
 
-            # Create a selectbox to choose a candidate with safe indexing
-            content_candidate_options = []
-            content_valid_indices = []
-            for i, (score, idx) in enumerate(ranked_resumes):
-                try:
-                    idx_int = int(round(float(idx)))
-                    if 0 <= idx_int < len(file_names):
-                        content_candidate_options.append(f"#{i + 1}: {file_names[idx_int]} ({float(score):.2f}%)")
-                        content_valid_indices.append((float(score), idx_int))
-                    else:
-                        st.warning(f"Skipping out-of-bounds resume index {idx} in content selection")
-                except (ValueError, TypeError) as e:
-                    st.warning(f"Skipping invalid resume index {idx} in content selection: {str(e)}")
-            
-            if not content_candidate_options:
-                st.error("No valid resume content to display. Please check your input files and try again.")
-                st.stop()
-            
-            content_selected_candidate = st.selectbox(
-                "Select Candidate Resume",
-                content_candidate_options,
-                key="content_select"
-            )
+            # Picking a resume only reruns this fragment
+            @st.fragment
+            def resume_content():
+                if not candidate_options:
+                    st.info("No candidates match the Overview filters.")
+                    return
+                content_selected_position = st.selectbox(
+                    "Select Candidate Resume",
+                    list(candidate_options),
+                    format_func=candidate_options.get,
+                    key="content_select"
+                )
 
-            # Get the selected candidate index
-            if content_selected_candidate in content_candidate_options:
-                content_selected_idx = content_candidate_options.index(content_selected_candidate)
-                if 0 <= content_selected_idx < len(content_valid_indices):
-                    _, content_resume_idx = content_valid_indices[content_selected_idx]
-                else:
-                    st.error("Invalid selection. Please try again.")
-                    st.stop()
-            else:
-                st.error("Invalid selection. Please select a valid candidate.")
-                st.stop()
+                # Get the selected candidate index
+                content_resume_idx = indices[content_selected_position]
 
-            # Display resume content
-            st.markdown("<div class='card'>", unsafe_allow_html=True)
-            st.markdown(f"**Resume Text for {file_names[content_resume_idx]}:**")
-            st.markdown("<div class='highlight'>", unsafe_allow_html=True)
-            st.text_area(
-                "Extracted Resume Content",
-                resume_texts[content_resume_idx],
-                height=400,
-                disabled=True
-            )
-            st.markdown("</div>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+                # Display resume content
+                st.markdown("<div class='card'>", unsafe_allow_html=True)
+                st.markdown(f"**Resume Text for {file_names[content_resume_idx]}:**")
+                st.markdown("<div class='highlight'>", unsafe_allow_html=True)
+                st.text_area(
+                    "Extracted Resume Content",
+                    results.text(content_resume_idx),
+                    height=400,
+                    disabled=True
+                )
+                st.markdown("</div>", unsafe_allow_html=True)
+                st.markdown("</div>", unsafe_allow_html=True)
+
+            resume_content()
 
             # Job description comparison
             st.markdown("<div class='card'>", unsafe_allow_html=True)
@@ -865,4 +1196,31 @@ elif page == "Results":
                 disabled=True
             )
             st.markdown("</div>", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+            st.markdown("</div>", unsafe_allow_html=True)
+
+        # Stage breakdown of the last processing run, plus this page's rendering
+        if st.session_state.get("performance"):
+            performance = st.session_state["performance"]
+            with st.expander("⚡ Performance"):
+                counters = " · ".join(f"{name} {value}" for name, value in sorted(performance["counters"].items()))
+                st.caption(f"Last run: {performance['wall_seconds']:.2f} s wall time" + (f" · {counters}" if counters else ""))
+                stages = pd.DataFrame(performance["stages"] + render_recorder.summary())
+                st.dataframe(
+                    stages,
+                    column_config={
+                        "stage": "Stage",
+                        "calls": "Calls",
+                        "seconds": st.column_config.NumberColumn("Seconds", format="%.3f"),
+                        "mean_ms": st.column_config.NumberColumn("Mean (ms)", format="%.2f"),
+                        "max_ms": st.column_config.NumberColumn("Max (ms)", format="%.2f"),
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+                st.caption("Stages can nest (e.g. encode.model runs inside ranking), so times do not add up to the wall time.")
+                st.download_button(
+                    "💾 Download as JSONL",
+                    data=json.dumps(performance) + "\n" + json.dumps(render_recorder.to_dict()) + "\n",
+                    file_name="performance.jsonl",
+                    mime="application/json"
+                )
@@ -0,0 +1,300 @@
+"""
+Benchmark harness for the extraction and ranking pipeline.
+
+Generates synthetic resumes (as plain text and as minimal single-font PDFs that
+pdfplumber and PyPDF2 can read), then times each stage separately at several
+corpus sizes and reports throughput, p50/p95 latency and peak RSS:
+
+    python benchmark.py                          # 10, 100, 1000 and 10000 documents
+    python benchmark.py --sizes 10 100 --stages preprocess_text rank_resumes
+    python benchmark.py --compare benchmarks/results-20250101-120000.json
+    python benchmark.py --write-fixtures fixtures/ --sizes 200
+
+Results are saved as JSON (``benchmarks/`` by default) so runs can be compared
+over time. The on-disk embedding and job profile caches are disabled unless
+``--use-cache`` is given, so model time is measured rather than cache hits.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+STAGES = ['extract_text_from_pdf', 'preprocess_text', 'extract_keywords', 'calculate_section_scores', 'rank_resumes',
+          'encode_fixed', 'encode_bucketed']
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+SKILLS = [
+    'python', 'java', 'javascript', 'typescript', 'sql', 'postgresql', 'aws', 'azure', 'docker', 'kubernetes',
+    'terraform', 'react', 'node', 'django', 'flask', 'spark', 'pandas', 'numpy', 'scikit-learn', 'pytorch',
+    'tensorflow', 'machine learning', 'data analysis', 'statistics', 'excel', 'tableau', 'agile', 'scrum',
+    'git', 'linux', 'rest apis', 'microservices', 'ci/cd', 'communication', 'leadership', 'project management',
+]
+TITLES = ['Software Engineer', 'Data Scientist', 'Data Analyst', 'DevOps Engineer', 'Product Manager',
+          'Machine Learning Engineer', 'Backend Developer', 'Frontend Developer', 'QA Engineer']
+DEGREES = ['B.Sc. Computer Science', 'M.Sc. Data Science', 'B.Eng. Electrical Engineering',
+           'MBA', 'B.A. Economics', 'Ph.D. Statistics']
+VERBS = ['Built', 'Designed', 'Led', 'Maintained', 'Migrated', 'Optimized', 'Automated', 'Shipped']
+OBJECTS = ['a reporting pipeline', 'the billing service', 'an internal dashboard', 'data ingestion jobs',
+           'the recommendation model', 'CI pipelines', 'customer-facing APIs', 'a feature store']
+
+JOB_DESCRIPTION = (
+    "We are hiring a Senior Machine Learning Engineer to build and deploy models in production. "
+    "Required skills: Python, SQL, AWS, Docker, Kubernetes, PyTorch or TensorFlow, and strong statistics. "
+    "Experience with data pipelines, Spark and CI/CD is a plus. You will lead a small team, work in an agile "
+    "environment and communicate results to stakeholders. A degree in Computer Science, Statistics or a related "
+    "field and 5+ years of experience are expected."
+)
+
+
+# -- synthetic corpus ---------------------------------------------------------
+
+def make_resume_text(rng):
+    """Return one synthetic resume with summary, experience, education and skills sections."""
+    title = rng.choice(TITLES)
+    lines = [f"Candidate {rng.randint(1000, 9999)}", title, "",
+             "Summary", f"{title} with {rng.randint(1, 15)} years of experience in "
+             f"{', '.join(rng.sample(SKILLS, 3))}.", ""]
+    lines.append(rng.choice(["Experience", "Work History", "Professional Experience"]))
+    for _ in range(rng.randint(2, 5)):
+        lines.append(f"{rng.choice(TITLES)}, Company {rng.randint(1, 500)} ({rng.randint(2005, 2024)})")
+        for _ in range(rng.randint(2, 4)):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {', '.join(rng.sample(SKILLS, 2))}")
+    lines += ["", "Education", f"{rng.choice(DEGREES)}, University {rng.randint(1, 200)}", ""]
+    lines.append(rng.choice(["Skills", "Technical Skills", "Key Skills"]))
+    lines.append(", ".join(rng.sample(SKILLS, rng.randint(5, 12))))
+    return "\n".join(lines)
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace").decode(
+        "latin-1")
+
+
+def make_pdf(text, lines_per_page=50):
+    """Build a minimal multi-page PDF (Helvetica, one text line per row) containing ``text``."""
+    lines = text.split("\n")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for page_lines in pages:
+        content = "BT /F1 10 Tf 13 TL 50 780 Td " + " ".join(
+            f"({_pdf_escape(line)}) '" for line in page_lines) + " ET"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+        content_ref = len(objects)
+        objects.append("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Contents {content_ref} 0 R /Resources << /Font << /F1 3 0 R >> >> >>")
+        page_refs.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{ref} 0 R' for ref in page_refs)}] /Count {len(page_refs)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def make_corpus(size, seed=0):
+    rng = random.Random(seed)
+    return [make_resume_text(rng) for _ in range(size)]
+
+
+# -- measurement --------------------------------------------------------------
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(latencies, documents, total_seconds):
+    return {
+        "documents": documents,
+        "seconds": total_seconds,
+        "docs_per_sec": documents / total_seconds if total_seconds else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def time_each(func, items):
+    """Call ``func`` on every item and return per-call latencies and total time."""
+    latencies = []
+    started = time.perf_counter()
+    for item in items:
+        call_started = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - call_started)
+    return latencies, time.perf_counter() - started
+
+
+def padding_ratio(texts, bucketed, batch_size=64):
+    """Padded over real tokens, and the batch count, for one encode of ``texts`` (estimated, model-independent)."""
+    import resume_processing as rp
+
+    lengths = [rp.estimate_tokens(text, 256) for text in texts]
+    if bucketed:
+        batches = rp.schedule_batches(lengths)
+    else:
+        # sentence-transformers sorts one call's texts by length, then cuts batch_size batches
+        order = sorted(range(len(lengths)), key=lambda pos: -lengths[pos])
+        batches = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+    padded = sum(max(lengths[pos] for pos in batch) * len(batch) for batch in batches)
+    return padded / max(sum(lengths), 1), len(batches)
+
+
+def run_stage(stage, texts, pdfs, repeats):
+    import io
+    import resume_processing as rp
+
+    if stage == 'extract_text_from_pdf':
+        latencies, total = time_each(lambda data: rp.extract_text_from_pdf(io.BytesIO(data)), pdfs)
+        return summarize(latencies, len(pdfs), total)
+    if stage == 'preprocess_text':
+        latencies, total = time_each(rp.preprocess_text, texts)
+        return summarize(latencies, len(texts), total)
+    if stage == 'extract_keywords':
+        cleaned = [rp.preprocess_text(text) for text in texts]
+        latencies, total = time_each(rp.extract_keywords, cleaned)
+        return summarize(latencies, len(texts), total)
+    if stage == 'calculate_section_scores':
+        job_clean = rp.preprocess_text(JOB_DESCRIPTION)
+        job_embedding = rp.encode_texts([job_clean])[0]
+        sections = ['experience', 'education', 'skills']
+        latencies, total = time_each(
+            lambda text: rp.calculate_section_scores(job_clean, text, sections, job_embedding=job_embedding), texts)
+        return summarize(latencies, len(texts), total)
+    if stage == 'rank_resumes':
+        # One call ranks the whole corpus, so latency is per call over several repeats
+        latencies, total = time_each(lambda _: rp.rank_resumes(JOB_DESCRIPTION, texts), range(repeats))
+        result = summarize(latencies, len(texts) * repeats, total)
+        result["calls"] = repeats
+        return result
+    if stage in ('encode_fixed', 'encode_bucketed'):
+        # Everything ranking embeds for the corpus (resume windows and sections), encoded
+        # with plain batch_size batches or the length-bucketed scheduler, uncached
+        cleaned = rp.preprocess_texts(texts)
+        chunks = [chunk for clean_text in cleaned for chunk in rp.chunk_text(clean_text)]
+        sections = [section for text in texts for name in rp.RANKING_SECTIONS
+                    for section in [rp.extract_section(text, name)] if section]
+        scheduler = rp.ENCODE_SCHEDULER
+        rp.ENCODE_SCHEDULER = 'fixed' if stage == 'encode_fixed' else 'bucketed'
+        try:
+            latencies, total = time_each(lambda _: rp.encode_texts(chunks + sections, use_cache=False), range(repeats))
+        finally:
+            rp.ENCODE_SCHEDULER = scheduler
+        result = summarize(latencies, len(texts) * repeats, total)
+        result["calls"] = repeats
+        result["texts"] = len(chunks) + len(sections)
+        result["padding_ratio"], result["batches"] = padding_ratio(chunks + sections, stage == 'encode_bucketed')
+        return result
+    raise ValueError(f"Unknown stage {stage}")
+
+
+def run_benchmark(sizes, stages, repeats=3, seed=0):
+    """Run every stage at every size and return the results as a JSON-ready dict."""
+    import resume_processing as rp
+
+    rp.warm_up()  # Keep model loading out of the first measurement
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "load_timings": dict(rp.load_timings),
+        "sizes": {},
+    }
+    for size in sizes:
+        texts = make_corpus(size, seed)
+        pdfs = [make_pdf(text) for text in texts] if 'extract_text_from_pdf' in stages else []
+        results["sizes"][str(size)] = {}
+        for stage in stages:
+            print(f"[{size:>6}] {stage}...", file=sys.stderr, flush=True)
+            results["sizes"][str(size)][stage] = run_stage(stage, texts, pdfs, repeats)
+    return results
+
+
+def print_table(results, baseline=None):
+    header = f"{'size':>6}  {'stage':<26} {'docs/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'RSS MB':>8}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for size, stages in results["sizes"].items():
+        for stage, row in stages.items():
+            rss = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "-"
+            line = (f"{size:>6}  {stage:<26} {row['docs_per_sec']:>10.1f} {row['p50_ms']:>9.2f} "
+                    f"{row['p95_ms']:>9.2f} {rss:>8}")
+            if baseline:
+                base = baseline.get("sizes", {}).get(size, {}).get(stage)
+                line += f" {row['docs_per_sec'] / base['docs_per_sec']:>7.2f}x" if base and base["docs_per_sec"] \
+                    else f" {'-':>8}"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume extraction and ranking pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Corpus sizes to test")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Stages to time")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeats for whole-corpus stages")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic corpus")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare throughput against")
+    parser.add_argument("--use-cache", action="store_true", help="Keep the persistent embedding and job profile caches enabled")
+    parser.add_argument("--write-fixtures", metavar="DIR",
+                        help="Only write a synthetic PDF corpus (largest --sizes value) to DIR and exit")
+    args = parser.parse_args(argv)
+
+    if args.write_fixtures:
+        os.makedirs(args.write_fixtures, exist_ok=True)
+        for number, text in enumerate(make_corpus(max(args.sizes), args.seed)):
+            with open(os.path.join(args.write_fixtures, f"resume_{number:05d}.pdf"), "wb") as f:
+                f.write(make_pdf(text))
+        print(f"Wrote {max(args.sizes)} PDFs to {args.write_fixtures}", file=sys.stderr)
+        return
+
+    import resume_processing as rp
+    if not args.use_cache:
+        rp.EMBEDDING_CACHE_DIR = ""
+        rp.JOB_PROFILE_DIR = ""
+
+    results = run_benchmark(args.sizes, args.stages, repeats=args.repeats, seed=args.seed)
+    output = args.output or os.path.join("benchmarks", f"results-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+    print(f"Saved {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# Persistent, content-addressed cache for sentence embeddings.
+#
+# Vectors are float32 blobs in a SQLite database (embeddings.sqlite3), keyed by a
+# hash of the model name and the exact text that was encoded, so an edited text
+# simply misses. SQLite's file locking makes the cache safe to share between
+# processes (the app, queue workers, the CLI), and every write touches only the
+# rows it stores.
+
+DB_FILE = "embeddings.sqlite3"
+
+# SQLite limits the number of bound parameters, so lookups go in chunks
+_QUERY_CHUNK = 500
+
+# A hit only refreshes its LRU timestamp once it is this many seconds old, so
+# lookups of recently used entries stay read-only and do not take the write lock
+TOUCH_INTERVAL = 600
+
+
+def make_key(model_name, text):
+    """Return the cache key for a piece of text encoded by a given model."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache with size-bounded LRU eviction.
+
+    ``max_entries`` bounds the number of stored vectors; when the cache is full
+    the least recently used entries are deleted (recency is tracked to within
+    ``touch_interval`` seconds). ``hits`` and ``misses`` count lookups since
+    the cache was opened. ``dim`` may be left as None, in which case it is
+    taken from the first vector read or stored, so the cache can be used
+    without loading the model.
+    """
+
+    def __init__(self, cache_dir, dim=None, max_entries=100_000, touch_interval=TOUCH_INTERVAL):
+        self.cache_dir = cache_dir
+        self.dim = int(dim) if dim else None
+        self.max_entries = int(max_entries)
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    # -- storage -----------------------------------------------------------
+
+    def _connect(self):
+        """Open the database on first use (and again in a forked child)."""
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.cache_dir, DB_FILE), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers do not block the writer
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings (used)")
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def flush(self):
+        """Kept for compatibility; every ``put_many`` is committed as it happens."""
+
+    # -- lookups -----------------------------------------------------------
+
+    def get_many(self, keys):
+        """
+        Look up several keys at once.
+
+        Returns ``(vectors, missing)`` where ``vectors`` is a float32 array with
+        one row per key (zeros for misses) and ``missing`` lists the positions
+        that were not found.
+        """
+        keys = list(keys)
+        found = {}
+        stale = []  # Hits whose LRU timestamp is due for a refresh
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(keys), _QUERY_CHUNK):
+                chunk = list(dict.fromkeys(keys[start:start + _QUERY_CHUNK]))
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, dim, vector, used FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, dim, blob, used in rows:
+                    if self.dim is None:
+                        self.dim = dim
+                    if dim == self.dim:
+                        found[key] = np.frombuffer(blob, dtype=np.float32)
+                        if used < now - self.touch_interval:
+                            stale.append(key)
+            if stale:
+                # Mark the hits as recently used for eviction
+                with conn:
+                    conn.executemany("UPDATE embeddings SET used = ? WHERE key = ?", [(now, key) for key in stale])
+
+            missing = [pos for pos, key in enumerate(keys) if key not in found]
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        if self.dim is None:
+            return np.zeros((len(keys), 0), dtype=np.float32), missing
+        vectors = np.zeros((len(keys), self.dim), dtype=np.float32)
+        for pos, key in enumerate(keys):
+            vector = found.get(key)
+            if vector is not None:
+                vectors[pos] = vector
+        return vectors, missing
+
+    def put_many(self, keys, vectors):
+        """Store vectors under the given keys, evicting the oldest entries if full."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            conn = self._connect()
+            now = time.time()
+            with conn:  # One transaction: the rows and the eviction commit together
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dim, vector, used) VALUES (?, ?, ?, ?)",
+                    [(key, vectors.shape[1], vector.tobytes(), now) for key, vector in zip(keys, vectors)],
+                )
+                excess = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM embeddings WHERE key IN "
+                        "(SELECT key FROM embeddings ORDER BY used LIMIT ?)", (excess,)
+                    )
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM embeddings")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            size = self._connect().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": size,
+            "capacity": self.max_entries,
+        }
+
+    def __len__(self):
+        return self.stats()["entries"]
@@ -0,0 +1,164 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Lightweight per-stage timers and counters for the screening pipeline.
+#
+# Hot-path code wraps each stage in ``with timer('stage'):`` and bumps counters
+# with ``count('name', n)``. Nothing is recorded unless a Recorder is active in
+# the current context (``with recording() as recorder:``); otherwise a timer is
+# one context-variable lookup and a shared no-op object, so instrumentation can
+# stay in place when profiling is off.
+
+# Every finished recording is appended to this JSONL file when it is set
+PROFILE_LOG = os.environ.get('RESUME_PROFILE_LOG', '')
+
+_active = contextvars.ContextVar('instrumentation_recorder', default=None)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('recorder', 'name', 'started')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Recorder:
+    """
+    Accumulates call counts and seconds per stage, plus free-form counters.
+
+    Stage names are dotted (``encode.model``, ``sections.segment``); stages may
+    nest, so their times are not meant to add up to the wall time.
+    """
+
+    def __init__(self, label=None):
+        self.label = label
+        self.started = time.time()
+        self.wall_seconds = 0.0
+        self.stages = {}  # name -> [calls, seconds, max seconds]
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name):
+        return _Timer(self, name)
+
+    def add(self, name, seconds):
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                self.stages[name] = [1, seconds, seconds]
+            else:
+                stage[0] += 1
+                stage[1] += seconds
+                stage[2] = max(stage[2], seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        """Return one dict per stage, slowest first."""
+        with self._lock:
+            stages = [(name, list(values)) for name, values in self.stages.items()]
+        return [
+            {'stage': name, 'calls': calls, 'seconds': seconds, 'mean_ms': seconds / calls * 1000,
+             'max_ms': longest * 1000}
+            for name, (calls, seconds, longest) in sorted(stages, key=lambda item: item[1][1], reverse=True)
+        ]
+
+    def to_dict(self):
+        """JSON-ready record of the recording."""
+        return {
+            'label': self.label,
+            'started': self.started,
+            'wall_seconds': self.wall_seconds,
+            'stages': self.summary(),
+            'counters': dict(self.counters),
+        }
+
+
+@contextmanager
+def recording(label=None, log_path=None):
+    """
+    Record every timer and counter hit in this context into a new Recorder.
+
+    The record is appended to ``log_path`` (default ``RESUME_PROFILE_LOG``)
+    when the block exits; pass ``""`` to skip the log.
+    """
+    recorder = Recorder(label)
+    token = _active.set(recorder)
+    started = time.perf_counter()
+    try:
+        yield recorder
+    finally:
+        recorder.wall_seconds = time.perf_counter() - started
+        _active.reset(token)
+        path = PROFILE_LOG if log_path is None else log_path
+        if path:
+            write_jsonl(recorder, path)
+
+
+def active():
+    """The Recorder active in this context, or None."""
+    return _active.get()
+
+
+def timer(name):
+    """Context manager timing one stage; a no-op when nothing is recording."""
+    recorder = _active.get()
+    return _NULL_TIMER if recorder is None else _Timer(recorder, name)
+
+
+def count(name, n=1):
+    recorder = _active.get()
+    if recorder is not None:
+        recorder.count(name, n)
+
+
+def write_jsonl(recorder, path):
+    """Append one recording as a JSON line."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    record = recorder.to_dict() if isinstance(recorder, Recorder) else recorder
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def format_summary(record):
+    """Human-readable stage table for a recording (a Recorder or its ``to_dict``)."""
+    if isinstance(record, Recorder):
+        record = record.to_dict()
+    lines = [f"{'stage':<24} {'calls':>7} {'seconds':>9} {'mean ms':>9} {'max ms':>9}"]
+    for stage in record['stages']:
+        lines.append(f"{stage['stage']:<24} {stage['calls']:>7} {stage['seconds']:>9.3f} "
+                     f"{stage['mean_ms']:>9.2f} {stage['max_ms']:>9.2f}")
+    lines.append(f"wall time {record['wall_seconds']:.3f} s")
+    if record['counters']:
+        lines.append(", ".join(f"{name}={value}" for name, value in sorted(record['counters'].items())))
+    return "\n".join(lines)
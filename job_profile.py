@@ -0,0 +1,122 @@
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Everything derived from a job description, computed once and reused.
+#
+# A JobProfile bundles the cleaned text, the extracted keywords, each keyword's
+# preprocessed tokens (what the resume term indexes are probed with) and the
+# normalized job embedding. Profiles are keyed by a hash of the job text plus
+# the model and keyword-model state that produced them, kept in a small
+# in-process LRU and written to disk so other sessions and processes reuse them.
+
+
+class JobProfile:
+    """
+    Precomputed job side of a ranking.
+
+    ``keywords`` is the array returned by extract_keywords and
+    ``keyword_tokens`` holds one token tuple per keyword, in the same order.
+    """
+
+    def __init__(self, key, job_description, clean_text, keywords, keyword_tokens, embedding):
+        self.key = key
+        self.job_description = job_description
+        self.clean_text = clean_text
+        self.keywords = np.asarray(keywords, dtype=str)
+        self.keyword_tokens = [tuple(tokens) for tokens in keyword_tokens]
+        self.embedding = np.asarray(embedding, dtype=np.float32)
+
+    def to_bytes(self):
+        """Serialize to an ``.npz`` payload (no pickles)."""
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            job_description=np.array(self.job_description),
+            clean_text=np.array(self.clean_text),
+            keywords=self.keywords,
+            keyword_tokens=np.array(json.dumps(self.keyword_tokens)),
+            embedding=self.embedding,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, key, data):
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            return cls(
+                key,
+                str(arrays['job_description']),
+                str(arrays['clean_text']),
+                arrays['keywords'],
+                json.loads(str(arrays['keyword_tokens'])),
+                arrays['embedding'],
+            )
+
+
+class JobProfileCache:
+    """
+    Two-level profile cache: an LRU of ``max_entries`` profiles in memory, backed
+    by one ``.npz`` file per profile under ``cache_dir`` (``""`` keeps it in
+    memory only). ``hits`` and ``misses`` count lookups since it was created.
+    """
+
+    def __init__(self, cache_dir, max_entries=256):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".npz")
+
+    def _remember(self, profile):
+        with self._lock:
+            self._profiles[profile.key] = profile
+            self._profiles.move_to_end(profile.key)
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+    def get(self, key):
+        """Return the profile stored under ``key``, or None on a miss."""
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                self.hits += 1
+                return profile
+        if self.cache_dir:
+            try:
+                with open(self._path(key), "rb") as f:
+                    profile = JobProfile.from_bytes(key, f.read())
+            except (OSError, ValueError, KeyError):
+                profile = None
+        with self._lock:
+            if profile is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(profile)
+        return profile
+
+    def put(self, profile):
+        """Store a profile in memory and, when enabled, on disk."""
+        self._remember(profile)
+        if not self.cache_dir:
+            return
+        path = self._path(profile.key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(profile.to_bytes())
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        """Forget the in-memory profiles; files on disk are left alone."""
+        with self._lock:
+            self._profiles.clear()
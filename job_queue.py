@@ -0,0 +1,366 @@
+"""
+SQLite-backed job queue for screening runs.
+
+The Streamlit app (or any client) submits a job description plus PDF bytes and
+gets a job id back; worker processes claim queued jobs, extract and rank the
+resumes, and record progress and results in the same database. Because the
+state lives in SQLite rather than in a browser session, a run survives page
+reloads, and several users share the same warm workers.
+
+Run a standalone worker service with:
+
+    python job_queue.py --workers 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager, nullcontext
+
+DEFAULT_DB_PATH = os.environ.get('RESUME_QUEUE_DB', os.path.join('.cache', 'jobs.sqlite3'))
+EMBEDDED_WORKERS = int(os.environ.get('RESUME_QUEUE_WORKERS', 1))  # Started by the web app; 0 = external service
+HEARTBEAT_INTERVAL = 10  # Seconds between heartbeats from a busy worker
+HEARTBEAT_TIMEOUT = 120  # Seconds before a running job with no heartbeat is requeued
+MAX_ATTEMPTS = int(os.environ.get('RESUME_QUEUE_MAX_ATTEMPTS', 3))  # Claims before a job that keeps losing its worker fails
+JOB_MAX_AGE = 7 * 24 * 3600  # Seconds before a finished job and its stored result are pruned
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,            -- queued, running, done, failed
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    heartbeat REAL,
+    worker TEXT,
+    job_description TEXT NOT NULL,
+    options TEXT NOT NULL,
+    progress_done INTEGER NOT NULL DEFAULT 0,
+    progress_total INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+"""
+
+
+class JobQueue:
+    """Thin wrapper around the queue database; safe to use from several processes."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Databases created before the attempts column
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "attempts" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    # -- client side ---------------------------------------------------------
+
+    def submit(self, job_description, files, options=None):
+        """Queue a screening run for ``(name, pdf_bytes)`` files and return its id."""
+        job_id = uuid.uuid4().hex
+        self.prune()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO jobs (id, status, created, job_description, options, progress_total) "
+                "VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, time.time(), job_description, json.dumps(options or {}), len(files)),
+            )
+            conn.executemany(
+                "INSERT INTO job_files (job_id, idx, name, data) VALUES (?, ?, ?, ?)",
+                [(job_id, idx, name, sqlite3.Binary(data)) for idx, (name, data) in enumerate(files)],
+            )
+            conn.execute("COMMIT")
+        return job_id
+
+    def status(self, job_id):
+        """Return a job's status and progress (without its result), or None if unknown."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, created, started, finished, progress_done, progress_total, attempts, error "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def result(self, job_id):
+        """Return the stored result of a finished job, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT result FROM jobs WHERE id = ? AND status = 'done'", (job_id,)).fetchone()
+        return json.loads(row["result"]) if row and row["result"] else None
+
+    # -- worker side ---------------------------------------------------------
+
+    def claim(self, worker_id):
+        """Atomically take the oldest queued job; returns its row as a dict, or None."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, job_description, options FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started = ?, heartbeat = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (worker_id, now, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def files(self, job_id):
+        """Return the ``(name, pdf_bytes)`` files of a job in submission order."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name, data FROM job_files WHERE job_id = ? ORDER BY idx", (job_id,)).fetchall()
+        return [(row["name"], bytes(row["data"])) for row in rows]
+
+    def update_progress(self, job_id, done):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET progress_done = ?, heartbeat = ? WHERE id = ?", (done, time.time(), job_id))
+
+    def heartbeat(self, job_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time(), job_id))
+
+    # A worker whose job was requeued (e.g. after a stalled heartbeat) may still finish it;
+    # only the worker that currently holds the job may record its outcome
+    def complete(self, job_id, worker_id, result):
+        """Record a job's result; returns False if ``worker_id`` no longer owns it."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            owned = conn.execute(
+                "UPDATE jobs SET status = 'done', finished = ?, result = ?, progress_done = progress_total "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), json.dumps(result), job_id, worker_id),
+            ).rowcount
+            if owned:
+                conn.execute("DELETE FROM job_files WHERE job_id = ?", (job_id,))  # Inputs are no longer needed
+            conn.execute("COMMIT")
+        return bool(owned)
+
+    def fail(self, job_id, worker_id, error):
+        """Mark a job failed; returns False if ``worker_id`` no longer owns it."""
+        with self._connect() as conn:
+            return bool(conn.execute(
+                "UPDATE jobs SET status = 'failed', finished = ?, error = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), error, job_id, worker_id),
+            ).rowcount)
+
+    def prune(self, max_age=JOB_MAX_AGE):
+        """Delete finished jobs (with their results and any leftover files) older than ``max_age`` seconds."""
+        cutoff = time.time() - max_age
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM job_files WHERE job_id IN "
+                "(SELECT id FROM jobs WHERE status IN ('done', 'failed') AND finished < ?)",
+                (cutoff,),
+            )
+            pruned = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished < ?", (cutoff,)
+            ).rowcount
+            conn.execute("COMMIT")
+        return pruned
+
+    def requeue_stale(self, timeout=HEARTBEAT_TIMEOUT, max_attempts=MAX_ATTEMPTS):
+        """Put running jobs whose worker stopped sending heartbeats back in the queue."""
+        return self._release("heartbeat < ?", (time.time() - timeout,), max_attempts)
+
+    def requeue_worker(self, worker_id, max_attempts=MAX_ATTEMPTS):
+        """Put the running jobs of a worker known to be dead back in the queue right away."""
+        return self._release("worker = ?", (worker_id,), max_attempts)
+
+    def _release(self, condition, params, max_attempts):
+        # A job that has already used its attempts probably kills its worker; fail it instead
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET "
+                "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "error = CASE WHEN attempts >= ? THEN 'Worker stopped after ' || attempts || ' attempts' END, "
+                "finished = CASE WHEN attempts >= ? THEN ? END, "
+                "worker = NULL, progress_done = 0 "
+                f"WHERE status = 'running' AND {condition}",
+                (max_attempts, max_attempts, max_attempts, time.time()) + tuple(params),
+            ).rowcount
+
+
+def process_job(queue, job, extraction_workers=1):
+    """Extract and rank one claimed job, reporting progress as resumes are scored."""
+    from instrumentation import recording
+    from pdf_extraction import extract_texts_parallel
+    from resume_processing import rank_resumes_cascade, rank_resumes_stream
+
+    files = queue.files(job["id"])
+    options = job["options"]
+    resume_texts = []
+    file_names = []
+    errors = []
+
+    def extracted_texts():
+        for done, result in enumerate(extract_texts_parallel(files, max_workers=extraction_workers), start=1):
+            queue.update_progress(job["id"], done)
+            if result.error:
+                errors.append({"name": result.name, "error": result.error})
+                continue
+            resume_texts.append(result.text)
+            file_names.append(result.name)
+            yield result.text
+
+    timings = recording(f"job {job['id']}") if options.get("record_timings") else nullcontext()
+    with timings as recorder:
+        cascade_top_m = options.get("cascade_top_m")
+        lexical_only = set()
+        if cascade_top_m:
+            for _ in extracted_texts():
+                pass
+            ranked, lexical_only = rank_resumes_cascade(job["job_description"], resume_texts, cascade_top_m,
+                                                        batch_size=options.get("batch_size", 64))
+        else:
+            scored = []
+            for update in rank_resumes_stream(job["job_description"], extracted_texts(),
+                                              batch_size=options.get("batch_size", 64)):
+                scored.extend(update["batch"])
+            ranked = sorted(scored, key=lambda x: x[0], reverse=True)
+
+    return {
+        "job_description": job["job_description"],
+        "ranked_resumes": [[float(score), int(idx)] for score, idx in ranked],
+        "lexical_only": sorted(int(idx) for idx in lexical_only),
+        "resume_texts": resume_texts,
+        "resume_files": file_names,
+        "errors": errors,
+        "performance": recorder.to_dict() if recorder else None,
+    }
+
+
+def run_worker(db_path=DEFAULT_DB_PATH, poll_interval=1.0, extraction_workers=1):
+    """Claim and process jobs forever; the embedding model stays loaded between jobs."""
+    from resume_processing import warm_up
+
+    queue = JobQueue(db_path)
+    worker_id = worker_name(os.getpid())
+    warm_up()
+    while True:
+        queue.requeue_stale()
+        job = queue.claim(worker_id)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        # Keep the heartbeat fresh while the job runs, however long a single step takes
+        stop = threading.Event()
+        beat = threading.Thread(target=_beat, args=(queue, job["id"], stop), daemon=True)
+        beat.start()
+        try:
+            queue.complete(job["id"], worker_id, process_job(queue, job, extraction_workers))
+        except Exception:
+            queue.fail(job["id"], worker_id, traceback.format_exc(limit=5))
+        finally:
+            stop.set()
+            beat.join()
+
+
+def worker_name(pid):
+    """Worker id recorded on the jobs a worker process claims."""
+    return f"{os.uname().nodename if hasattr(os, 'uname') else 'local'}:{pid}"
+
+
+def _beat(queue, job_id, stop):
+    while not stop.wait(HEARTBEAT_INTERVAL):
+        queue.heartbeat(job_id)
+
+
+def start_workers(db_path=DEFAULT_DB_PATH, count=1, daemon=True, extraction_workers=1):
+    """
+    Start ``count`` worker processes and return them.
+
+    Daemon workers (as started from the web app) cannot have children, so they
+    extract inline; a standalone service can give each worker its own pool.
+    """
+    context = multiprocessing.get_context("spawn")  # Never fork a threaded web server
+    workers = []
+    for _ in range(count):
+        process = context.Process(
+            target=run_worker,
+            args=(db_path, 1.0, 1 if daemon else extraction_workers),
+            daemon=daemon,
+            name="resume-screening-worker",
+        )
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def restart_dead_workers(workers, db_path=DEFAULT_DB_PATH, extraction_workers=1):
+    """
+    Replace every process in ``workers`` (updated in place) that has exited.
+
+    Jobs the dead worker was running are requeued at once instead of waiting
+    for their heartbeat to go stale. Returns the number of workers restarted.
+    """
+    queue = None
+    restarted = 0
+    for position, process in enumerate(workers):
+        if process.is_alive():
+            continue
+        queue = queue or JobQueue(db_path)
+        queue.requeue_worker(worker_name(process.pid))
+        workers[position] = start_workers(db_path, 1, daemon=process.daemon,
+                                          extraction_workers=extraction_workers)[0]
+        restarted += 1
+    return restarted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run resume screening queue workers.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Queue database path")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--extraction-workers", type=int, default=1, help="PDF extraction processes per worker")
+    args = parser.parse_args(argv)
+
+    workers = start_workers(args.db, args.workers, daemon=False, extraction_workers=args.extraction_workers)
+    try:
+        # Supervise: restart any worker that dies
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            restart_dead_workers(workers, args.db, args.extraction_workers)
+    except KeyboardInterrupt:
+        for process in workers:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
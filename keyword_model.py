@@ -0,0 +1,113 @@
+import math
+import os
+from collections import Counter
+
+import joblib
+import numpy as np
+
+# Corpus-level TF-IDF model for keyword extraction.
+#
+# Fitting TF-IDF on a single job description makes every IDF equal, so the
+# ranking collapses to raw term frequency. This model keeps document
+# frequencies over a whole corpus of past job descriptions and resumes, so
+# common boilerplate ("team", "work") is down-weighted and discriminative terms
+# rise to the top. Document frequencies are stored rather than only the fitted
+# vectorizer so new documents can be folded in without refitting from scratch.
+
+
+class KeywordModel:
+    """
+    TF-IDF keyword extractor fitted over a corpus and persisted with joblib.
+
+    ``fit`` starts over, ``partial_fit`` adds documents incrementally. IDF uses
+    the same smoothed formula as scikit-learn, ``log((1 + n) / (1 + df)) + 1``,
+    so terms never seen in the corpus get the highest weight.
+    """
+
+    def __init__(self, ngram_range=(1, 1), max_features=50_000):
+        self.ngram_range = tuple(ngram_range)
+        self.max_features = max_features
+        self.doc_freq = Counter()
+        self.n_docs = 0
+        self.vectorizer = None
+        self._analyzer = None
+
+    @property
+    def analyzer(self):
+        """Tokenizer shared with the vectorizer (lowercasing, English stopwords, n-grams)."""
+        if self._analyzer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer  # Lazy: sklearn is slow to import
+            self._analyzer = TfidfVectorizer(stop_words='english', ngram_range=self.ngram_range).build_analyzer()
+        return self._analyzer
+
+    def fit(self, documents):
+        """Fit document frequencies on a corpus, discarding any previous state."""
+        self.doc_freq = Counter()
+        self.n_docs = 0
+        return self.partial_fit(documents)
+
+    def partial_fit(self, documents):
+        """Fold new documents into the document frequencies and rebuild the vectorizer."""
+        analyzer = self.analyzer
+        for document in documents:
+            self.doc_freq.update(set(analyzer(document)))
+            self.n_docs += 1
+        self._rebuild_vectorizer()
+        return self
+
+    def idf(self, term):
+        return math.log((1 + self.n_docs) / (1 + self.doc_freq.get(term, 0))) + 1
+
+    def _rebuild_vectorizer(self):
+        """Build a TfidfVectorizer over the most frequent terms with the corpus IDF."""
+        terms = [term for term, _ in self.doc_freq.most_common(self.max_features)]
+        if not terms:
+            self.vectorizer = None
+            return
+        terms.sort()
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        vectorizer = TfidfVectorizer(stop_words='english', ngram_range=self.ngram_range, vocabulary=terms)
+        vectorizer.idf_ = np.array([self.idf(term) for term in terms])
+        self.vectorizer = vectorizer
+
+    def transform(self, texts):
+        """Return the sparse, L2-normalized TF-IDF matrix for a list of texts."""
+        if self.vectorizer is None:
+            raise ValueError("KeywordModel is not fitted")
+        return self.vectorizer.transform(texts)
+
+    def extract_keywords(self, text, top_n=20):
+        """Return the top N terms of a text ranked by term frequency times corpus IDF."""
+        counts = Counter(self.analyzer(text))
+        if not counts:
+            return np.array([], dtype=str)
+        terms = sorted(counts)  # Alphabetical first, so ties break the same way every time
+        weights = np.array([counts[term] * self.idf(term) for term in terms])
+        order = np.argsort(-weights, kind='stable')[:top_n]
+        return np.array(terms)[order]
+
+    def save(self, path):
+        """Persist the model with joblib."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        state = {
+            'ngram_range': self.ngram_range,
+            'max_features': self.max_features,
+            'doc_freq': dict(self.doc_freq),
+            'n_docs': self.n_docs,
+            'vectorizer': self.vectorizer,
+        }
+        tmp_path = path + '.tmp'
+        joblib.dump(state, tmp_path, compress=3)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a model saved with ``save``."""
+        state = joblib.load(path)
+        model = cls(ngram_range=state['ngram_range'], max_features=state['max_features'])
+        model.doc_freq = Counter(state['doc_freq'])
+        model.n_docs = state['n_docs']
+        model.vectorizer = state['vectorizer']
+        return model
@@ -0,0 +1,309 @@
+import glob
+import io
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pdfplumber
+import PyPDF2
+
+from text_cache import TextCache, hash_bytes
+
+# PDF text extraction, kept free of the NLP imports in resume_processing so that
+# extraction worker processes start quickly and do not load the embedding model.
+
+DEFAULT_WORKERS = int(os.environ.get('RESUME_EXTRACTION_WORKERS', 0)) or (os.cpu_count() or 1)
+DEFAULT_TIMEOUT = float(os.environ.get('RESUME_EXTRACTION_TIMEOUT', 60))
+# Files read and queued per extraction worker at a time; bounds memory on large corpora
+IN_FLIGHT_PER_WORKER = 2
+
+# "auto" tries the fast PyPDF2 backend first and falls back to pdfplumber when the
+# text looks poor; "pypdf2" or "pdfplumber" force a single backend
+PDF_BACKEND = os.environ.get('RESUME_PDF_BACKEND', 'auto')
+
+# Quality heuristic for the fast path: enough text per page and few garbled characters
+MIN_CHARS_PER_PAGE = 200
+MAX_GARBLED_RATIO = 0.05
+
+# Extracted text is cached by file hash; entries from other extractor versions are ignored
+EXTRACTOR_VERSION = f"{PDF_BACKEND}:pypdf2-{PyPDF2.__version__}:pdfplumber-{pdfplumber.__version__}"
+TEXT_CACHE_DIR = os.environ.get('RESUME_TEXT_CACHE_DIR', os.path.join('.cache', 'text'))
+text_cache = TextCache(TEXT_CACHE_DIR, EXTRACTOR_VERSION) if TEXT_CACHE_DIR else None
+
+# One finished file: its position in the upload, name, text, error message (or None)
+# and whether the text came from the cache
+ExtractionResult = namedtuple('ExtractionResult', ['index', 'name', 'text', 'error', 'cached'],
+                              defaults=[False])
+
+
+class ExtractionTimeout(Exception):
+    """Raised inside a worker when a single file exceeds its time budget."""
+
+
+class PdfplumberExtractor:
+    """Layout-aware extractor; slow but handles multi-column and unusual PDFs."""
+
+    name = 'pdfplumber'
+
+    def extract_pages(self, pdf_file):
+        with pdfplumber.open(pdf_file) as pdf:
+            return [page.extract_text() or "" for page in pdf.pages]
+
+
+class PyPDF2Extractor:
+    """Fast content-stream extractor with no layout analysis."""
+
+    name = 'pypdf2'
+
+    def extract_pages(self, pdf_file):
+        reader = PyPDF2.PdfReader(pdf_file)
+        return [page.extract_text() or "" for page in reader.pages]
+
+
+EXTRACTORS = {
+    'pypdf2': PyPDF2Extractor(),
+    'pdfplumber': PdfplumberExtractor(),
+}
+
+
+def join_pages(pages):
+    """Join page texts the same way for every backend."""
+    text = ""
+    for extracted in pages:
+        if extracted:
+            text += extracted + "\n"
+    return text.strip()
+
+
+def garbled_ratio(text):
+    """Fraction of characters that are control, private-use or replacement characters."""
+    if not text:
+        return 0.0
+    garbled = text.count("(cid:") * 5  # Unmapped glyphs, e.g. "(cid:12)"
+    for char in text:
+        if char in "\n\t\r":
+            continue
+        if char == "\ufffd" or unicodedata.category(char) in ("Cc", "Co", "Cs", "Cn"):
+            garbled += 1
+    return min(1.0, garbled / len(text))
+
+
+def is_good_text(pages):
+    """Decide whether fast-path text is dense and clean enough to keep."""
+    if not pages:
+        return False
+    text = join_pages(pages)
+    density = len(text) / len(pages)
+    return density >= MIN_CHARS_PER_PAGE and garbled_ratio(text) <= MAX_GARBLED_RATIO
+
+
+def _extract_pages(pdf_file, backend=None):
+    """
+    Extract the text of every page, letting errors propagate.
+
+    In "auto" mode the PyPDF2 backend runs first; if it fails or its output
+    fails ``is_good_text`` the document is re-read with pdfplumber.
+    """
+    backend = backend or PDF_BACKEND
+    if backend != 'auto':
+        return join_pages(EXTRACTORS[backend].extract_pages(pdf_file))
+
+    try:
+        pages = EXTRACTORS['pypdf2'].extract_pages(pdf_file)
+        if is_good_text(pages):
+            return join_pages(pages)
+    except Exception:
+        pass  # Fall back to the layout-aware extractor
+
+    if hasattr(pdf_file, 'seek'):
+        pdf_file.seek(0)
+    return join_pages(EXTRACTORS['pdfplumber'].extract_pages(pdf_file))
+
+# Function to extract text from PDF
+def extract_text_from_pdf(pdf_file):
+    try:
+        return _extract_pages(pdf_file)
+    except Exception as e:
+        return f"Error extracting text: {str(e)}"
+
+
+def _raise_timeout(signum, frame):
+    raise ExtractionTimeout()
+
+
+def _extract_worker(index, name, data, timeout):
+    """Extract one file from its raw bytes inside a worker process."""
+    # SIGALRM is only available on POSIX and can only be armed from the main thread
+    # (Streamlit runs scripts in other threads); elsewhere the timeout is not enforced
+    use_alarm = (timeout and hasattr(signal, 'SIGALRM')
+                 and threading.current_thread() is threading.main_thread())
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return ExtractionResult(index, name, _extract_pages(io.BytesIO(data)), None)
+    except ExtractionTimeout:
+        return ExtractionResult(index, name, "", f"Timed out after {timeout:g}s")
+    except Exception as e:
+        return ExtractionResult(index, name, "", str(e))
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def extract_texts_parallel(files, max_workers=None, timeout=DEFAULT_TIMEOUT, use_cache=True):
+    """
+    Extract text from many PDFs across a process pool.
+
+    ``files`` is any iterable of ``(name, source)`` pairs, where ``source`` is
+    the PDF bytes or a path to read. It is consumed lazily and at most
+    ``IN_FLIGHT_PER_WORKER`` files per worker are read and queued at a time,
+    so a large corpus is never held in memory at once. Results are yielded as
+    ``ExtractionResult`` tuples in the order the files finish, so callers can
+    update progress as they go; ``index`` is the file's position in ``files``.
+    A file that fails, cannot be read or takes longer than ``timeout`` seconds
+    comes back with ``error`` set instead of raising.
+
+    Files whose hash is already in the text cache are yielded as soon as they
+    are read without being parsed; only the rest are sent to the pool.
+    """
+    cache = text_cache if use_cache else None
+    digests = {}
+
+    def prepared():
+        for index, (name, source) in enumerate(files):
+            try:
+                data = _read_source(source)
+            except OSError as e:
+                yield index, name, None, ExtractionResult(index, name, "", str(e))
+                continue
+            if cache is not None:
+                digest = hash_bytes(data)
+                text = cache.get(digest)
+                if text is not None:
+                    yield index, name, None, ExtractionResult(index, name, text, None, True)
+                    continue
+                digests[index] = digest
+            yield index, name, data, None
+
+    if hasattr(files, '__len__'):
+        max_workers = max(1, min(max_workers or DEFAULT_WORKERS, len(files)))
+    for result in _run_extraction(prepared(), max_workers, timeout):
+        digest = digests.pop(result.index, None)
+        if digest is not None and result.error is None:
+            cache.put(digest, result.text)
+        yield result
+
+
+def _read_source(source):
+    """PDF bytes from raw bytes or a path."""
+    if isinstance(source, (bytes, bytearray)):
+        return source
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _run_extraction(items, max_workers, timeout):
+    """
+    Extract ``(index, name, data, ready)`` items, in a pool when more than one
+    worker is useful. Items with a ``ready`` result are passed straight through.
+    """
+    max_workers = max(1, max_workers or DEFAULT_WORKERS)
+
+    # A pool is not worth starting for a single worker
+    if max_workers == 1:
+        for index, name, data, ready in items:
+            yield ready or _extract_worker(index, name, data, timeout)
+        return
+
+    # Never fork a threaded web server; workers are only spawned once a file needs parsing
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        in_flight = {}
+        for index, name, data, ready in items:
+            if ready is not None:
+                yield ready
+                continue
+            in_flight[executor.submit(_extract_worker, index, name, data, timeout)] = (index, name)
+            if len(in_flight) >= IN_FLIGHT_PER_WORKER * max_workers:
+                yield from _finished(in_flight)
+        while in_flight:
+            yield from _finished(in_flight)
+
+
+def _finished(in_flight):
+    """Wait for at least one submitted extraction and yield what finished, removing it from ``in_flight``."""
+    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+    for future in done:
+        index, name = in_flight.pop(future)
+        try:
+            yield future.result()
+        except Exception as e:  # e.g. a worker process died
+            yield ExtractionResult(index, name, "", str(e))
+
+
+def benchmark_backends(paths, backends=None):
+    """
+    Time each extraction backend over a corpus of PDF files.
+
+    Returns ``{backend: {"files", "pages", "seconds", "pages_per_sec", "errors"}}``.
+    For "auto" the number of documents that fell back to pdfplumber is
+    reported as ``"fallbacks"``.
+    """
+    backends = backends or list(EXTRACTORS) + ['auto']
+    corpus = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            corpus.append(f.read())
+
+    report = {}
+    for backend in backends:
+        pages = 0
+        errors = 0
+        fallbacks = 0
+        start = time.perf_counter()
+        for data in corpus:
+            try:
+                if backend == 'auto':
+                    fast_pages = EXTRACTORS['pypdf2'].extract_pages(io.BytesIO(data))
+                    if is_good_text(fast_pages):
+                        pages += len(fast_pages)
+                        continue
+                    fallbacks += 1
+                    pages += len(EXTRACTORS['pdfplumber'].extract_pages(io.BytesIO(data)))
+                else:
+                    pages += len(EXTRACTORS[backend].extract_pages(io.BytesIO(data)))
+            except Exception:
+                errors += 1
+        seconds = time.perf_counter() - start
+        report[backend] = {
+            "files": len(corpus),
+            "pages": pages,
+            "seconds": seconds,
+            "pages_per_sec": pages / seconds if seconds else 0.0,
+            "errors": errors,
+        }
+        if backend == 'auto':
+            report[backend]["fallbacks"] = fallbacks
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python pdf_extraction.py <directory or glob of PDFs>
+    target = sys.argv[1] if len(sys.argv) > 1 else "."
+    pattern = os.path.join(target, "**", "*.pdf") if os.path.isdir(target) else target
+    pdf_paths = sorted(glob.glob(pattern, recursive=True))
+    if not pdf_paths:
+        sys.exit(f"No PDF files found for {target}")
+    for backend, result in benchmark_backends(pdf_paths).items():
+        line = (f"{backend:<11} {result['pages']:>6} pages in {result['seconds']:.2f}s "
+                f"({result['pages_per_sec']:.1f} pages/sec, {result['errors']} errors")
+        if 'fallbacks' in result:
+            line += f", {result['fallbacks']} fallbacks"
+        print(line + ")")
@@ -0,0 +1,95 @@
+import os
+import time
+import uuid
+import zlib
+
+import numpy as np
+
+# Compact representation of one ranking run, as kept in a browser session.
+#
+# Scores and resume indices are numpy arrays in rank order, and the keyword-only
+# flags a boolean array, so a session costs a few bytes per candidate plus the
+# file names. Raw resume text is written once to a compressed file on disk (one
+# zlib block per resume, located through an offsets array) and read back only
+# when a single resume is displayed.
+
+RESULTS_DIR = os.environ.get('RESUME_RESULTS_DIR', os.path.join('.cache', 'results'))
+RESULTS_MAX_AGE = 7 * 24 * 3600  # Seconds before a result's text file is pruned
+
+
+class RankingResult:
+    """
+    One ranking: ``scores`` and ``indices`` (rank order), ``file_names`` and
+    ``lexical_only`` (by resume index), and lazily loaded resume texts.
+    """
+
+    def __init__(self, result_id, job_description, scores, indices, file_names, lexical_only, text_offsets,
+                 texts_path):
+        self.result_id = result_id
+        self.job_description = job_description
+        self.scores = scores
+        self.indices = indices
+        self.file_names = file_names
+        self.lexical_only = lexical_only
+        self.text_offsets = text_offsets
+        self.texts_path = texts_path
+
+    @classmethod
+    def create(cls, job_description, ranked, file_names, resume_texts, lexical_only=(), result_id=None,
+               results_dir=RESULTS_DIR):
+        """Build a result from ``(score, index)`` pairs and spill the resume texts to disk."""
+        result_id = result_id or uuid.uuid4().hex
+        scores = np.array([score for score, _ in ranked], dtype=np.float32)
+        indices = np.array([idx for _, idx in ranked], dtype=np.int32)
+        flags = np.zeros(len(file_names), dtype=bool)
+        flags[list(lexical_only)] = True
+
+        os.makedirs(results_dir, exist_ok=True)
+        prune_results(results_dir)
+        texts_path = os.path.join(results_dir, f"{result_id}.texts.z")
+        offsets = np.zeros(len(resume_texts) + 1, dtype=np.int64)
+        tmp_path = f"{texts_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            for i, text in enumerate(resume_texts):
+                offsets[i + 1] = offsets[i] + f.write(zlib.compress(text.encode("utf-8"), 6))
+        os.replace(tmp_path, texts_path)
+
+        return cls(result_id, job_description, scores, indices, list(file_names), flags, offsets, texts_path)
+
+    def with_ranking(self, job_description, ranked, lexical_only=()):
+        """Another job's ranking of the same resumes, sharing this result's text file."""
+        flags = np.zeros(len(self.file_names), dtype=bool)
+        flags[list(lexical_only)] = True
+        return RankingResult(uuid.uuid4().hex, job_description,
+                             np.array([score for score, _ in ranked], dtype=np.float32),
+                             np.array([idx for _, idx in ranked], dtype=np.int32),
+                             self.file_names, flags, self.text_offsets, self.texts_path)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def ranked(self):
+        """``(score, index)`` pairs in rank order, as returned by rank_resumes."""
+        return list(zip(self.scores.tolist(), self.indices.tolist()))
+
+    def text(self, idx):
+        """Read one resume's raw text back from disk."""
+        start, end = self.text_offsets[idx], self.text_offsets[idx + 1]
+        try:
+            with open(self.texts_path, "rb") as f:
+                f.seek(start)
+                return zlib.decompress(f.read(end - start)).decode("utf-8")
+        except (OSError, zlib.error):
+            return ""  # Pruned or removed; the ranking itself is still usable
+
+
+def prune_results(results_dir=RESULTS_DIR, max_age=RESULTS_MAX_AGE):
+    """Delete result text files older than ``max_age`` seconds."""
+    cutoff = time.time() - max_age
+    for name in os.listdir(results_dir):
+        path = os.path.join(results_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,90 @@
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+# Per-resume work that does not depend on the job description.
+#
+# ResumeArtifacts holds a resume's raw and cleaned text (zlib-compressed), its
+# section spans and the embeddings of the resume's windows and of each scored
+# section. An ArtifactStore keeps them by file hash, so re-running a ranking
+# after adding files or editing the job description only processes the new
+# files and the job side. The store is bounded by memory, not by count, since
+# one long resume can outweigh dozens of short ones.
+
+ARTIFACT_STORE_MB = float(os.environ.get('RESUME_ARTIFACT_STORE_MB', 256))
+
+
+class ResumeArtifacts:
+    """
+    Everything rank_resume_artifacts needs about one resume.
+
+    ``text`` and ``clean_text`` are decompressed on access. ``chunk_embeddings``
+    has one row per window of the cleaned text (a single row for resumes that
+    fit the model). ``section_embeddings`` has one row per scored section; rows
+    whose ``section_mask`` entry is False were not found and are all zeros.
+    """
+
+    __slots__ = ('key', '_text', '_clean_text', 'sections', 'chunk_embeddings', 'section_embeddings',
+                 'section_mask')
+
+    def __init__(self, key, text, clean_text, sections, chunk_embeddings, section_embeddings, section_mask):
+        self.key = key
+        self._text = zlib.compress(text.encode('utf-8'))
+        self._clean_text = zlib.compress(clean_text.encode('utf-8'))
+        self.sections = sections
+        self.chunk_embeddings = chunk_embeddings
+        self.section_embeddings = section_embeddings
+        self.section_mask = section_mask
+
+    @property
+    def text(self):
+        return zlib.decompress(self._text).decode('utf-8')
+
+    @property
+    def clean_text(self):
+        return zlib.decompress(self._clean_text).decode('utf-8')
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by this entry."""
+        return (len(self._text) + len(self._clean_text) + 64 * len(self.sections)
+                + self.chunk_embeddings.nbytes + self.section_embeddings.nbytes + self.section_mask.nbytes)
+
+
+class ArtifactStore:
+    """
+    Thread-safe LRU map of file hash to ResumeArtifacts, bounded to ``max_mb``
+    megabytes. ``nbytes`` is the current total.
+    """
+
+    def __init__(self, max_mb=ARTIFACT_STORE_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.nbytes = 0
+        self._artifacts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._artifacts
+
+    def __len__(self):
+        return len(self._artifacts)
+
+    def get(self, key):
+        with self._lock:
+            artifacts = self._artifacts.get(key)
+            if artifacts is not None:
+                self._artifacts.move_to_end(key)
+            return artifacts
+
+    def put_many(self, artifacts):
+        with self._lock:
+            for item in artifacts:
+                previous = self._artifacts.pop(item.key, None)
+                if previous is not None:
+                    self.nbytes -= previous.nbytes
+                self._artifacts[item.key] = item
+                self.nbytes += item.nbytes
+            while self.nbytes > self.max_bytes and self._artifacts:
+                _, evicted = self._artifacts.popitem(last=False)
+                self.nbytes -= evicted.nbytes
@@ -1,143 +1,990 @@
-import pdfplumber
-import nltk
+import time
+_import_started = time.perf_counter()
+
+import hashlib
+import heapq
+import multiprocessing
+import os
 import re
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import filterfalse
 import numpy as np
+from embedding_cache import EmbeddingCache, make_key
+from instrumentation import timer, count
+from job_profile import JobProfile, JobProfileCache
+from resume_artifacts import ResumeArtifacts
+from text_cache import TextCache
+from vector_index import VectorIndex
+from pdf_extraction import extract_text_from_pdf  # Re-exported for existing callers
+
+MODEL_NAME = 'all-MiniLM-L6-v2'  # Pre-trained model for embeddings
+
+# Persistent embedding cache shared by every ranking run (set the directory to "" to disable)
+EMBEDDING_CACHE_DIR = os.environ.get('RESUME_EMBEDDING_CACHE_DIR', os.path.join('.cache', 'embeddings'))
+EMBEDDING_CACHE_SIZE = int(os.environ.get('RESUME_EMBEDDING_CACHE_SIZE', 100_000))
+
+# Batches at least this large are preprocessed across a process pool
+PREPROCESS_PARALLEL_MIN = int(os.environ.get('RESUME_PREPROCESS_PARALLEL_MIN', 20_000))
+PREPROCESS_WORKERS = int(os.environ.get('RESUME_PREPROCESS_WORKERS', 0)) or (os.cpu_count() or 1)
+
+# Resumes longer than the model's input are embedded as overlapping windows of this
+# many cleaned tokens, and the window similarities pooled per resume: 'max' (best
+# window) or 'mean'. MiniLM reads 256 word pieces and silently drops the rest; cleaned
+# resume words (skills, tool names, numbers) split into 1.5-2 pieces each, so 128
+# words keeps nearly every window whole. Larger windows give each embedding more
+# context and mean fewer windows to encode, but lose their tails to truncation.
+CHUNK_TOKENS = int(os.environ.get('RESUME_CHUNK_TOKENS', 128))
+CHUNK_OVERLAP = int(os.environ.get('RESUME_CHUNK_OVERLAP', 32))
+CHUNK_POOLING = os.environ.get('RESUME_CHUNK_POOLING', 'max')
+
+# Texts sent to the model are sorted by length and batched so that the padded size
+# of each batch (longest text x batch size) stays under this many tokens, with at
+# most this fraction of it spent on padding; set the scheduler to 'fixed' for
+# plain batches of batch_size texts
+ENCODE_TOKEN_BUDGET = int(os.environ.get('RESUME_ENCODE_TOKEN_BUDGET', 64 * 256))
+ENCODE_MAX_PADDING = float(os.environ.get('RESUME_ENCODE_MAX_PADDING', 0.1))
+ENCODE_SCHEDULER = os.environ.get('RESUME_ENCODE_SCHEDULER', 'bucketed')
+
+# Job description profiles, kept in memory and on disk (set the directory to "" for memory only)
+JOB_PROFILE_DIR = os.environ.get('RESUME_JOB_PROFILE_DIR', os.path.join('.cache', 'job_profiles'))
+JOB_PROFILE_CACHE_SIZE = int(os.environ.get('RESUME_JOB_PROFILE_CACHE_SIZE', 256))
+
+# Word n-gram range of job keywords, e.g. "1,2" to also extract two-word phrases
+# ("machine learning") that are then matched as phrases in every ranking. A fitted
+# keyword model is fitted with this range and its own range wins once it exists.
+KEYWORD_NGRAM_RANGE = tuple(int(n) for n in os.environ.get('RESUME_KEYWORD_NGRAM_RANGE', '1,1').split(','))
+
+# Corpus-level TF-IDF model used by extract_keywords once it has been fitted
+KEYWORD_MODEL_PATH = os.environ.get('RESUME_KEYWORD_MODEL_PATH', os.path.join('.cache', 'keyword_model.joblib'))
+
+# The model, stopwords and embedding cache are loaded on first use rather than at
+# import, so importing this module stays cheap. Seconds spent on each are recorded
+# in load_timings.
+_model = None
+_stop_words = None
+_embedding_cache = None
+_model_lock = threading.Lock()
+_stop_words_lock = threading.Lock()
+_embedding_cache_lock = threading.Lock()
+_keyword_model = None
+_keyword_model_mtime = None
+_keyword_model_lock = threading.Lock()
+_job_profile_cache = None
+_job_profile_cache_lock = threading.Lock()
+_resume_pools = {}
+_resume_pools_lock = threading.Lock()
+load_timings = {}
+
+def get_model():
+    """Return the shared SentenceTransformer, loading it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                started = time.perf_counter()
+                with timer('load.model'):
+                    from sentence_transformers import SentenceTransformer
+                    _model = SentenceTransformer(MODEL_NAME)
+                load_timings['model'] = time.perf_counter() - started
+    return _model
 
-# Download NLTK resources (run once)
-nltk.download('stopwords', quiet=True)
-from nltk.corpus import stopwords
+def get_stop_words():
+    """Return the English stopword set, downloading the NLTK corpus only if it is missing."""
+    global _stop_words
+    if _stop_words is None:
+        with _stop_words_lock:
+            if _stop_words is None:
+                started = time.perf_counter()
+                import nltk
+                from nltk.corpus import stopwords
+                try:
+                    words = stopwords.words('english')
+                except LookupError:
+                    nltk.download('stopwords', quiet=True)
+                    words = stopwords.words('english')
+                _stop_words = set(words)
+                load_timings['stopwords'] = time.perf_counter() - started
+    return _stop_words
 
-stop_words = set(stopwords.words('english'))
-model = SentenceTransformer('all-MiniLM-L6-v2')  # Pre-trained model for embeddings
+def get_embedding_cache():
+    """Return the shared embedding cache, or None when caching is disabled."""
+    global _embedding_cache
+    if _embedding_cache is None and EMBEDDING_CACHE_DIR:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_DIR, max_entries=EMBEDDING_CACHE_SIZE)
+    return _embedding_cache
 
-# Function to extract text from PDF
-def extract_text_from_pdf(pdf_file):
-    text = ""
+def get_keyword_model():
+    """
+    Return the persisted corpus keyword model, or None if none has been fitted.
+    
+    The file is reloaded when it changes on disk, so a model updated by another
+    process (e.g. the CLI) is picked up without a restart.
+    """
+    global _keyword_model, _keyword_model_mtime
     try:
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
-    except Exception as e:
-        text = f"Error extracting text: {str(e)}"
-    return text.strip()
+        mtime = os.path.getmtime(KEYWORD_MODEL_PATH)
+    except OSError:
+        return _keyword_model
+    if mtime != _keyword_model_mtime:
+        with _keyword_model_lock:
+            if mtime != _keyword_model_mtime:
+                from keyword_model import KeywordModel  # Lazy: pulls in scikit-learn
+                _keyword_model = KeywordModel.load(KEYWORD_MODEL_PATH)
+                _keyword_model_mtime = mtime
+    return _keyword_model
+
+def _save_keyword_model(keyword_model):
+    global _keyword_model, _keyword_model_mtime
+    with _keyword_model_lock:
+        keyword_model.save(KEYWORD_MODEL_PATH)
+        _keyword_model = keyword_model
+        _keyword_model_mtime = os.path.getmtime(KEYWORD_MODEL_PATH)
+
+def fit_keyword_model(documents, ngram_range=None):
+    """
+    Fit the corpus keyword model on historical job descriptions and resumes and persist it.
+    
+    ``ngram_range`` defaults to ``KEYWORD_NGRAM_RANGE``; job profiles extract
+    keywords with the fitted model's range from then on.
+    """
+    from keyword_model import KeywordModel
+    keyword_model = KeywordModel(ngram_range=ngram_range or KEYWORD_NGRAM_RANGE)
+    keyword_model.fit(preprocess_texts(documents))
+    _save_keyword_model(keyword_model)
+    return keyword_model
+
+def update_keyword_model(documents):
+    """Fold newly arrived documents into the persisted keyword model without a full refit."""
+    from keyword_model import KeywordModel
+    keyword_model = get_keyword_model() or KeywordModel(ngram_range=KEYWORD_NGRAM_RANGE)
+    keyword_model.partial_fit(preprocess_texts(documents))
+    _save_keyword_model(keyword_model)
+    return keyword_model
+
+def get_job_profile_cache():
+    """Return the shared job profile cache."""
+    global _job_profile_cache
+    if _job_profile_cache is None:
+        with _job_profile_cache_lock:
+            if _job_profile_cache is None:
+                _job_profile_cache = JobProfileCache(JOB_PROFILE_DIR, max_entries=JOB_PROFILE_CACHE_SIZE)
+    return _job_profile_cache
+
+def warm_up():
+    """Load the model and stopwords ahead of time, e.g. from a background thread."""
+    get_stop_words()
+    get_model()
+    get_embedding_cache()
+
+def __getattr__(name):
+    # Keep the old module attributes working without loading anything at import
+    if name == 'model':
+        return get_model()
+    if name == 'stop_words':
+        return get_stop_words()
+    if name == 'embedding_cache':
+        return get_embedding_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Runs of word characters: the tokens left after replacing every \W with a space and splitting
+_TOKEN_PATTERN = re.compile(r'\w+')
 
 # Function to clean and preprocess text
 def preprocess_text(text):
-    text = text.lower()
-    text = re.sub(r'\W', ' ', text)  # Remove special characters
-    text = re.sub(r'\s+', ' ', text)  # Remove extra spaces
-    text = ' '.join([word for word in text.split() if word not in stop_words])
-    return text
+    stop_words = get_stop_words()
+    return ' '.join(filterfalse(stop_words.__contains__, _TOKEN_PATTERN.findall(text.lower())))
 
-# Function to rank resumes based on job description
-def extract_keywords(text, top_n=20):
-    """Extract top N keywords from text using TF-IDF weights."""
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    import numpy as np
+def preprocess_texts(texts, workers=None):
+    """
+    Preprocess a batch of texts; the output matches preprocess_text item for item.
     
-    # Initialize and fit TF-IDF
-    vectorizer = TfidfVectorizer(stop_words='english', max_features=5000)
-    tfidf_matrix = vectorizer.fit_transform([text])
+    Batches of ``PREPROCESS_PARALLEL_MIN`` texts or more are split across a
+    process pool of ``workers`` (default ``PREPROCESS_WORKERS``) processes.
+    """
+    texts = list(texts)
+    workers = PREPROCESS_WORKERS if workers is None else workers
+    if workers > 1 and len(texts) >= PREPROCESS_PARALLEL_MIN:
+        # Never fork a threaded web server
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            return list(executor.map(preprocess_text, texts, chunksize=max(1, len(texts) // (workers * 4))))
     
-    # Get feature names and their scores
-    feature_array = np.array(vectorizer.get_feature_names_out())
-    tfidf_sorting = np.argsort(tfidf_matrix.toarray()).flatten()[::-1]
+    is_stop_word = get_stop_words().__contains__
+    find_tokens = _TOKEN_PATTERN.findall
+    return [' '.join(filterfalse(is_stop_word, find_tokens(text.lower()))) for text in texts]
+
+@lru_cache(maxsize=4096)
+def _keyword_tokens(keyword):
+    # Job keywords are looked up in every resume, so preprocess each one once
+    return tuple(preprocess_text(keyword).split())
+
+def build_term_index(clean_text):
+    """
+    Build an inverted index for one preprocessed text.
+    
+    Maps every token to the positions where it occurs, so whole-token and
+    phrase lookups are dictionary hits instead of substring scans.
+    """
+    term_index = {}
+    for position, token in enumerate(clean_text.split()):
+        term_index.setdefault(token, []).append(position)
+    return term_index
+
+def keyword_in_index(keyword, term_index):
+    """Check whether a keyword or multi-word phrase occurs as whole tokens in a term index."""
+    # Preprocess the keyword like the resume so stopwords inside phrases line up;
+    # a tuple is taken as already preprocessed tokens (see JobProfile.keyword_tokens)
+    tokens = keyword if isinstance(keyword, tuple) else _keyword_tokens(keyword)
+    if not tokens:
+        return False
+    starts = term_index.get(tokens[0])
+    if not starts:
+        return False
+    if len(tokens) == 1:
+        return True
     
-    # Return top N keywords
-    return feature_array[tfidf_sorting][:top_n]
+    # A phrase matches when each following token sits at the next position
+    following = [set(term_index.get(token, ())) for token in tokens[1:]]
+    if not all(following):
+        return False
+    return any(
+        all(start + offset in positions for offset, positions in enumerate(following, start=1))
+        for start in starts
+    )
+
+# Function to rank resumes based on job description
+def keyword_ngram_range(keyword_model=None):
+    """The n-gram range job keywords are extracted with: the fitted keyword model's, else ``KEYWORD_NGRAM_RANGE``."""
+    keyword_model = keyword_model or get_keyword_model()
+    return keyword_model.ngram_range if keyword_model is not None else tuple(KEYWORD_NGRAM_RANGE)
+
+def extract_keywords(text, top_n=20, ngram_range=None, keyword_model=None):
+    """
+    Extract top N keywords (or phrases, with a wider ngram_range) from text using TF-IDF weights.
+    
+    When a corpus keyword model is available (see fit_keyword_model) its IDF
+    ranks the terms; otherwise TF-IDF is fitted on the text alone. The default
+    ``ngram_range`` is keyword_ngram_range(); any other range skips the model.
+    """
+    with timer('keywords.extract'):
+        keyword_model = keyword_model or get_keyword_model()
+        ngram_range = tuple(ngram_range or keyword_ngram_range(keyword_model))
+        if keyword_model is not None and keyword_model.ngram_range == ngram_range:
+            return keyword_model.extract_keywords(text, top_n=top_n)
+        
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        # Initialize and fit TF-IDF
+        vectorizer = TfidfVectorizer(stop_words='english', max_features=5000, ngram_range=ngram_range)
+        tfidf_matrix = vectorizer.fit_transform([text])
+        
+        # Get feature names and their scores
+        feature_array = np.array(vectorizer.get_feature_names_out())
+        tfidf_sorting = np.argsort(tfidf_matrix.toarray()).flatten()[::-1]
+        
+        # Return top N keywords
+        return feature_array[tfidf_sorting][:top_n]
 
-def calculate_keyword_match_score(job_keywords, resume_text, weight=0.4):
-    """Calculate keyword matching score between job keywords and resume text."""
-    if not job_keywords.size or not resume_text:
+def calculate_keyword_match_score(job_keywords, resume_text, weight=0.4, term_index=None):
+    """
+    Calculate keyword matching score between job keywords and resume text.
+    
+    Keywords match whole tokens ("java" does not match "javascript") and may be
+    multi-word phrases, given as strings or as preprocessed token tuples. Pass a
+    prebuilt ``term_index`` to skip re-tokenizing the resume when it is scored
+    against many job descriptions.
+    """
+    if not len(job_keywords) or not (resume_text or term_index):
         return 0.0
+    if term_index is None:
+        term_index = build_term_index(preprocess_text(resume_text))
     
     # Count how many job keywords appear in the resume
-    matches = sum(1 for keyword in job_keywords if keyword.lower() in resume_text.lower())
+    matches = sum(1 for keyword in job_keywords if keyword_in_index(keyword, term_index))
     return (matches / len(job_keywords)) * 100 * weight
 
-def calculate_section_scores(job_desc, resume_text, sections):
-    """Calculate scores for different sections of the resume."""
-    section_scores = {}
-    
-    for section in sections:
-        # Simple section matching - in a real app, you'd want more sophisticated parsing
-        section_text = extract_section(resume_text, section)
-        if section_text:
-            # Calculate similarity for this section
-            section_embedding = model.encode([section_text])
-            job_embedding = model.encode([job_desc])
-            similarity = cosine_similarity(job_embedding, section_embedding)[0][0]
-            section_scores[section] = similarity * 100  # Convert to percentage
+def normalize_embeddings(embeddings):
+    """L2-normalize embedding rows so a dot product equals cosine similarity."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0  # Leave all-zero rows at zero, like cosine_similarity
+    return embeddings / norms
+
+# Word runs and single punctuation marks: a cheap lower bound on word-piece tokens
+_PIECE_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+def estimate_tokens(text, max_length=512):
+    """Approximate model tokens for a text (plus the two special tokens), capped at ``max_length``."""
+    return min(len(_PIECE_PATTERN.findall(text)) + 2, max_length)
+
+def schedule_batches(lengths, token_budget=None, max_padding=None):
+    """
+    Group text positions into batches of similar length for encoding.
+    
+    Positions are taken shortest first, and a batch is closed when adding the
+    next text would push its padded size (longest length x batch size) over
+    ``token_budget``, or its padding over ``max_padding`` of that size. Short
+    texts share big batches, long ones small ones, and a run of similar
+    lengths stays together. Returns a list of position lists.
+    """
+    token_budget = token_budget or ENCODE_TOKEN_BUDGET
+    max_padding = ENCODE_MAX_PADDING if max_padding is None else max_padding
+    batches = []
+    batch = []
+    real = 0
+    for pos in np.argsort(lengths, kind='stable'):
+        length = lengths[pos]
+        padded = length * (len(batch) + 1)
+        if batch and (padded > token_budget or padded - real - length > max_padding * padded):
+            batches.append(batch)
+            batch = []
+            real = 0
+        batch.append(int(pos))
+        real += length
+    if batch:
+        batches.append(batch)
+    return batches
+
+def encode_bucketed(texts, token_budget=None):
+    """Encode texts in length-sorted, token-budgeted batches and return rows in input order."""
+    model = get_model()
+    max_length = getattr(model, 'max_seq_length', None) or 512
+    batches = schedule_batches([estimate_tokens(text, max_length) for text in texts], token_budget)
+    count('encode.batches', len(batches))
+    embeddings = None
+    for batch in batches:
+        encoded = model.encode([texts[pos] for pos in batch], batch_size=len(batch), convert_to_numpy=True)
+        if embeddings is None:
+            embeddings = np.zeros((len(texts), encoded.shape[1]), dtype=np.float32)
+        embeddings[batch] = encoded  # Scatter back to the original positions
+    return embeddings
+
+def _encode_with_model(texts, batch_size=64):
+    """Run the model over texts (scheduled by ``ENCODE_SCHEDULER``) and normalize the result."""
+    count('encode.model_texts', len(texts))
+    with timer('encode.model'):
+        if ENCODE_SCHEDULER == 'fixed':
+            embeddings = get_model().encode(texts, batch_size=batch_size, convert_to_numpy=True)
         else:
-            section_scores[section] = 0.0
+            embeddings = encode_bucketed(texts)
+    return normalize_embeddings(embeddings)
+
+def encode_texts(texts, batch_size=64, use_cache=True):
+    """
+    Encode a list of texts in batches and return normalized float32 embeddings.
+    
+    Texts already in the embedding cache are not sent to the model; only the
+    distinct misses are encoded and then stored for the next run, so the model
+    is not even loaded when every text is cached. Misses are batched by length
+    under ``ENCODE_TOKEN_BUDGET`` (see encode_bucketed); ``batch_size`` applies
+    when ``ENCODE_SCHEDULER`` is ``'fixed'``.
+    """
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, get_model().get_sentence_embedding_dimension()), dtype=np.float32)
+    count('encode.texts', len(texts))
+    embedding_cache = get_embedding_cache() if use_cache else None
+    if embedding_cache is None:
+        return _encode_with_model(texts, batch_size)
+    
+    with timer('encode.cache'):
+        keys = [make_key(MODEL_NAME, text) for text in texts]
+        embeddings, missing = embedding_cache.get_many(keys)
+    if missing:
+        # Encode each distinct missing text once
+        missing_keys = list(dict.fromkeys(keys[pos] for pos in missing))
+        text_by_key = {keys[pos]: texts[pos] for pos in missing}
+        encoded = _encode_with_model([text_by_key[key] for key in missing_keys], batch_size)
+        with timer('encode.cache'):
+            embedding_cache.put_many(missing_keys, encoded)
+        if embeddings.shape[1] != encoded.shape[1]:
+            embeddings = np.zeros((len(texts), encoded.shape[1]), dtype=np.float32)
+        row_by_key = {key: row for row, key in enumerate(missing_keys)}
+        for pos in missing:
+            embeddings[pos] = encoded[row_by_key[keys[pos]]]
+    return embeddings
+
+def chunk_text(clean_text, size=None, overlap=None):
+    """
+    Split a cleaned text into windows of ``size`` tokens overlapping by ``overlap``.
+    
+    Texts that fit in one window are returned whole, so short resumes embed
+    exactly as before; the last window always reaches the end of the text.
+    Raises ValueError unless ``0 <= overlap < size``.
+    """
+    size = size or CHUNK_TOKENS
+    overlap = CHUNK_OVERLAP if overlap is None else overlap
+    if size <= 0 or not 0 <= overlap < size:
+        raise ValueError(f"Chunk overlap must be at least 0 and below the window size; got size={size}, overlap={overlap}")
+    tokens = clean_text.split()
+    if len(tokens) <= size:
+        return [clean_text]
+    step = size - overlap
+    return [' '.join(tokens[start:start + size]) for start in range(0, len(tokens) - overlap, step)]
+
+def _chunk_texts(resume_texts_clean):
+    # Every window of every resume, flattened; resume i owns chunks starts[i]:starts[i + 1]
+    chunks = []
+    starts = [0]
+    for clean_text in resume_texts_clean:
+        chunks.extend(chunk_text(clean_text))
+        starts.append(len(chunks))
+    count('encode.chunks', len(chunks))
+    return chunks, np.array(starts)
+
+def pool_chunk_similarities(similarities, starts, pooling=None):
+    """Pool chunk similarities (last axis) to one per resume, by ``CHUNK_POOLING`` unless given."""
+    pooling = pooling or CHUNK_POOLING
+    if pooling == 'mean':
+        return np.add.reduceat(similarities, starts[:-1], axis=-1) / np.diff(starts).astype(similarities.dtype)
+    if pooling != 'max':
+        raise ValueError(f"Unknown chunk pooling {pooling!r}; use 'max' or 'mean'")
+    return np.maximum.reduceat(similarities, starts[:-1], axis=-1)
+
+def _job_profile_stamp():
+    # Profiles depend on the embedding model, the keyword n-grams and the keyword model's IDF
+    keyword_model = get_keyword_model()  # Picks up a model refitted by another process
+    return f"{MODEL_NAME}|ngrams={keyword_ngram_range(keyword_model)}|keyword-model@{_keyword_model_mtime}"
+
+def get_job_profiles(job_descriptions, batch_size=64):
+    """
+    Return a JobProfile for each job description, building only the misses.
+    
+    Profiles are looked up by a hash of the text (and of the model state that
+    produced them) in memory, then on disk; missing ones are built together,
+    with their embeddings encoded in one batch, and stored for later runs.
+    """
+    job_descriptions = list(job_descriptions)
+    stamp = _job_profile_stamp()
+    keys = [make_key(stamp, job_description) for job_description in job_descriptions]
+    profile_cache = get_job_profile_cache()
+    with timer('job_profile.cache'):
+        profiles = [profile_cache.get(key) for key in keys]
+    
+    # Build each distinct missing description once
+    todo = {}
+    for key, job_description, profile in zip(keys, job_descriptions, profiles):
+        if profile is None:
+            todo.setdefault(key, job_description)
+    if todo:
+        count('job_profile.built', len(todo))
+        with timer('preprocess'):
+            clean_texts = preprocess_texts(todo.values())
+        keywords = [extract_keywords(clean_text) for clean_text in clean_texts]
+        embeddings = encode_texts(clean_texts, batch_size=batch_size)
+        built = {}
+        for (key, job_description), clean_text, job_keywords, embedding in zip(
+                todo.items(), clean_texts, keywords, embeddings):
+            tokens = [_keyword_tokens(str(keyword)) for keyword in job_keywords]
+            built[key] = JobProfile(key, job_description, clean_text, job_keywords, tokens, embedding)
+            profile_cache.put(built[key])
+        profiles = [profile or built[key] for key, profile in zip(keys, profiles)]
+    return profiles
+
+def get_job_profile(job_description, batch_size=64):
+    """Return the (cached) JobProfile for one job description."""
+    return get_job_profiles([job_description], batch_size=batch_size)[0]
+
+def calculate_section_scores(job_desc, resume_text, sections, job_embedding=None):
+    """Calculate scores for different sections of the resume."""
+    if job_embedding is None:
+        job_embedding = encode_texts([job_desc])[0]
+    scores = calculate_section_scores_batch(job_embedding, [resume_text], sections)
+    return {section: scores[0, i] for i, section in enumerate(sections)}
+
+def calculate_section_scores_batch(job_embedding, resume_texts, sections, batch_size=64):
+    """
+    Score every section of every resume against one job embedding.
+    
+    All non-empty sections are encoded together in batches and compared with a
+    single matrix product. Returns an array of shape (len(resume_texts), len(sections))
+    holding percentages, with 0.0 for sections that were not found.
+    """
+    section_scores = np.zeros((len(resume_texts), len(sections)), dtype=np.float32)
+    section_embeddings, rows, cols = _section_embeddings(resume_texts, sections, batch_size)
+    if len(rows):
+        similarities = section_embeddings @ job_embedding * 100  # Convert to percentage
+        section_scores[rows, cols] = similarities
     
     return section_scores
 
-def extract_section(text, section_name):
-    """Extract a specific section from resume text."""
-    # This is a simple implementation - you might want to use more sophisticated parsing
-    section_patterns = {
-        'experience': r'(?i)(experience|work history|employment)[^\w]*(.*?)(?=\n\n|$)',
-        'education': r'(?i)(education|academic background)[^\w]*(.*?)(?=\n\n|$)',
-        'skills': r'(?i)(skills|technical skills|key skills)[^\w]*(.*?)(?=\n\n|$)'
-    }
+def _section_embeddings(resume_texts, sections, batch_size=64):
+    """Embed every non-empty section; returns ``(embeddings, rows, cols)`` locating each in the score matrix."""
+    section_texts, rows, cols = _section_texts(resume_texts, sections)
+    if not section_texts:
+        return None, [], []
+    return encode_texts(section_texts, batch_size=batch_size), rows, cols
+
+def _section_texts(resume_texts, sections):
+    # Collect every section we found along with where its score belongs
+    section_texts = []
+    positions = []
+    with timer('sections.segment'):
+        for row, resume_text in enumerate(resume_texts):
+            # One pass over the resume finds the spans of every section
+            spans = segment_sections(resume_text)
+            for col, section in enumerate(sections):
+                span = spans.get(section)
+                if span and span[1] > span[0]:
+                    section_texts.append(resume_text[span[0]:span[1]])
+                    positions.append((row, col))
     
-    pattern = section_patterns.get(section_name.lower(), '')
-    if not pattern:
-        return ""
+    rows, cols = zip(*positions) if positions else ((), ())
+    return section_texts, list(rows), list(cols)
+
+def _encode_resumes(resume_texts, resume_texts_clean, sections, batch_size=64):
+    """
+    Embed every window and every section of a batch of resumes in one encode_texts call.
+    
+    Returns ``(chunk_embeddings, starts, section_embeddings, rows, cols)``: the
+    windows of resume ``i`` are rows ``starts[i]:starts[i + 1]`` of
+    ``chunk_embeddings`` and section rows are placed as in _section_embeddings.
+    One call lets the length scheduler batch long windows and short sections
+    separately.
+    """
+    chunks, starts = _chunk_texts(resume_texts_clean)
+    section_texts, rows, cols = _section_texts(resume_texts, sections)
+    embeddings = encode_texts(chunks + section_texts, batch_size=batch_size)
+    return embeddings[:len(chunks)], starts, embeddings[len(chunks):], rows, cols
+
+# Sections whose similarity to the job makes up the section score
+RANKING_SECTIONS = ['experience', 'education', 'skills']
+
+# Header synonyms for each known section; extend to recognise more headings or sections
+SECTION_SYNONYMS = {
+    'experience': ('experience', 'work history', 'employment'),
+    'education': ('education', 'academic background'),
+    'skills': ('skills', 'technical skills', 'key skills'),
+}
+
+@lru_cache(maxsize=32)
+def _section_header_pattern(synonyms):
+    """Compile one case-insensitive pattern matching every header synonym, plus a header -> section map."""
+    section_by_header = {header.lower(): section for section, names in synonyms for header in names}
+    headers = sorted(section_by_header, key=len, reverse=True)  # Prefer "technical skills" over "skills"
+    pattern = re.compile(r'(' + '|'.join(re.escape(header) for header in headers) + r')\W*', re.IGNORECASE)
+    return pattern, section_by_header
+
+def _synonyms_key(synonyms):
+    return tuple((section, tuple(names)) for section, names in synonyms.items())
+
+@lru_cache(maxsize=4096)
+def _segment_sections_cached(text, synonyms):
+    pattern, section_by_header = _section_header_pattern(synonyms)
+    spans = {}
+    for match in pattern.finditer(text):
+        section = section_by_header[match.group(1).lower()]
+        if section in spans:
+            continue
+        # A section runs from its header to the next blank line (or the end of the text)
+        body_start = match.end()
+        end = text.find('\n\n', body_start)
+        if end == -1:
+            end = len(text) - 1 if text.endswith('\n') and body_start < len(text) else len(text)
+        spans[section] = (match.start(), end)
+        if len(spans) == len(synonyms):
+            break
+    return spans
+
+def segment_sections(text, synonyms=None):
+    """
+    Find every known section of a resume in a single scan.
     
-    import re
-    match = re.search(pattern, text, re.DOTALL)
-    return match.group(0) if match else ""
+    Returns ``{section: (start, end)}`` character offsets for the first header
+    of each section found, using ``SECTION_SYNONYMS`` unless another mapping is
+    given. Results are cached per document, so adding sections does not add
+    passes over the text.
+    """
+    return _segment_sections_cached(text, _synonyms_key(synonyms or SECTION_SYNONYMS))
+
+def extract_section(text, section_name):
+    """Extract a specific section from resume text."""
+    span = segment_sections(text).get(section_name.lower())
+    return text[span[0]:span[1]] if span else ""
 
-def rank_resumes(job_description, resume_texts):
+def rank_resumes(job_description, resume_texts, batch_size=64, cascade_top_m=None, job_profile=None):
     """
     Enhanced resume ranking algorithm that combines multiple techniques:
     1. Semantic similarity using sentence transformers
     2. Keyword matching for important terms
     3. Section-based scoring for experience, education, and skills
+    
+    The job description is encoded once and all resumes and sections are encoded
+    in batches of ``batch_size``, so the cosine scores come from matrix products
+    instead of one model call per resume.
+    
+    With ``cascade_top_m`` only the best M resumes by lexical score get the
+    semantic and section scoring; see rank_resumes_cascade.
+    
+    Everything derived from the job description comes from its JobProfile,
+    cached across calls; pass a prebuilt ``job_profile`` to skip even the
+    lookup (``job_description`` is then ignored).
     """
-    if not job_description or not resume_texts:
+    if cascade_top_m:
+        return rank_resumes_cascade(job_description, resume_texts, cascade_top_m, batch_size=batch_size,
+                                    job_profile=job_profile)[0]
+    if not (job_profile or job_description) or not resume_texts:
         return []
     
+    count('rank.resumes', len(resume_texts))
+    job_profile = job_profile or get_job_profile(job_description, batch_size=batch_size)
+    
     # Preprocess texts
-    job_desc_clean = preprocess_text(job_description)
-    resume_texts_clean = [preprocess_text(text) for text in resume_texts]
+    with timer('preprocess'):
+        resume_texts_clean = preprocess_texts(resume_texts)
+    with timer('keywords.index'):
+        term_indexes = [build_term_index(text) for text in resume_texts_clean]
     
-    # Extract job keywords for matching
-    job_keywords = extract_keywords(job_desc_clean)
+    # 2. Keyword matching (30% weight), whole-token lookups in the prebuilt indexes
+    with timer('keywords.match'):
+        keyword_scores = [
+            calculate_keyword_match_score(job_profile.keyword_tokens, resume_text, weight=0.3, term_index=term_index)
+            for resume_text, term_index in zip(resume_texts, term_indexes)
+        ]
     
+    total_scores = _model_scores(job_profile.embedding, resume_texts, resume_texts_clean, batch_size) + keyword_scores
+    return _sort_scores(range(len(resume_texts)), total_scores)
+
+def _model_scores(job_embedding, resume_texts, resume_texts_clean, batch_size=64):
+    """Semantic (40%) plus section (30%) score for each resume, from batched embeddings."""
     # Define important sections to analyze
-    sections = ['experience', 'education', 'skills']
+    sections = RANKING_SECTIONS
     
-    # Calculate scores for each resume
-    ranked_resumes = []
+    # Encode every window and section of every resume together
+    chunk_embeddings, starts, section_embeddings, rows, cols = _encode_resumes(
+        resume_texts, resume_texts_clean, sections, batch_size=batch_size)
     
-    for idx, (resume_text, clean_text) in enumerate(zip(resume_texts, resume_texts_clean)):
-        # 1. Semantic similarity (40% weight)
-        resume_embedding = model.encode([clean_text])
-        job_embedding = model.encode([job_desc_clean])
-        semantic_score = cosine_similarity(job_embedding, resume_embedding)[0][0] * 100 * 0.4
-        
-        # 2. Keyword matching (30% weight)
-        keyword_score = calculate_keyword_match_score(job_keywords, resume_text, weight=0.3)
-        
-        # 3. Section-based scoring (30% weight)
-        section_scores = calculate_section_scores(job_desc_clean, resume_text, sections)
-        section_avg = sum(section_scores.values()) / len(section_scores) * 0.3 if section_scores else 0
-        
-        # Calculate total score (normalized to 0-100)
-        total_score = semantic_score + keyword_score + section_avg
-        
-        # Store index and score
-        ranked_resumes.append((idx, total_score))
+    # 1. Semantic similarity (40% weight) for all resumes in one product, pooled over windows
+    semantic_scores = pool_chunk_similarities(chunk_embeddings @ job_embedding, starts) * 100 * 0.4
+    
+    # 3. Section-based scoring (30% weight), batched across all resumes
+    section_matrix = np.zeros((len(resume_texts), len(sections)), dtype=np.float32)
+    if len(rows):
+        section_matrix[rows, cols] = section_embeddings @ job_embedding * 100  # Convert to percentage
+    section_avgs = section_matrix.mean(axis=1) * 0.3 if sections else np.zeros(len(resume_texts))
+    
+    return semantic_scores + section_avgs
+
+def _sort_scores(indices, scores):
+    """Return ``(score, index)`` tuples sorted by score, best first, ties in index order."""
+    # Store index and score
+    ranked_resumes = [(idx, score) for idx, score in zip(indices, scores)]
     
     # Sort by score in descending order
     ranked_resumes.sort(key=lambda x: x[1], reverse=True)
     
     # Convert to list of (score, index) tuples for compatibility
-    return [(score, idx) for idx, score in ranked_resumes]
\ No newline at end of file
+    return [(score, idx) for idx, score in ranked_resumes]
+
+def rank_resumes_multi(job_descriptions, resume_texts, batch_size=64):
+    """
+    Rank one pool of resumes against several job descriptions in a single pass.
+    
+    Every resume is preprocessed, indexed and embedded once, and the semantic
+    and section scores for all jobs come from jobs x resumes matrix products.
+    Returns ``(rankings, best_fit)``: ``rankings[j]`` is the rank_resumes result
+    for job ``j``, and ``best_fit[i]`` is the ``(job index, score)`` of resume
+    ``i``'s highest-scoring job.
+    """
+    job_descriptions = list(job_descriptions)
+    if not job_descriptions or not resume_texts:
+        return [[] for _ in job_descriptions], []
+    
+    count('rank.resumes', len(resume_texts))
+    count('rank.jobs', len(job_descriptions))
+    job_profiles = get_job_profiles(job_descriptions, batch_size=batch_size)
+    with timer('preprocess'):
+        resume_texts_clean = preprocess_texts(resume_texts)
+    with timer('keywords.index'):
+        term_indexes = [build_term_index(text) for text in resume_texts_clean]
+    
+    # Keyword matching (30% weight) for every job against the shared indexes
+    with timer('keywords.match'):
+        keyword_scores = np.array([
+            [calculate_keyword_match_score(profile.keyword_tokens, resume_text, weight=0.3, term_index=term_index)
+             for resume_text, term_index in zip(resume_texts, term_indexes)]
+            for profile in job_profiles
+        ])
+    
+    # Semantic (40%) and section (30%) scores as jobs x resumes matrices
+    sections = RANKING_SECTIONS
+    job_embeddings = np.stack([profile.embedding for profile in job_profiles])
+    chunk_embeddings, starts, section_embeddings, rows, cols = _encode_resumes(
+        resume_texts, resume_texts_clean, sections, batch_size=batch_size)
+    semantic_scores = pool_chunk_similarities(job_embeddings @ chunk_embeddings.T, starts) * 100 * 0.4
+    
+    section_matrix = np.zeros((len(job_descriptions), len(resume_texts), len(sections)), dtype=np.float32)
+    if len(rows):
+        section_matrix[:, rows, cols] = job_embeddings @ section_embeddings.T * 100
+    
+    total_scores = semantic_scores + section_matrix.mean(axis=2) * 0.3 + keyword_scores
+    rankings = [_sort_scores(range(len(resume_texts)), job_scores) for job_scores in total_scores]
+    best_jobs = total_scores.argmax(axis=0)
+    best_fit = [(int(job), float(total_scores[job, idx])) for idx, job in enumerate(best_jobs)]
+    return rankings, best_fit
+
+def build_resume_artifacts(resume_texts, keys=None, batch_size=64):
+    """
+    Do the job-independent work for a batch of resumes once.
+    
+    Returns one ResumeArtifacts per text (``keys``, e.g. file hashes, default to
+    the positions) holding the cleaned text, section spans and the embeddings
+    of each resume window (see chunk_text) and each section, ready to be scored against any job description.
+    """
+    resume_texts = list(resume_texts)
+    keys = range(len(resume_texts)) if keys is None else keys
+    with timer('preprocess'):
+        resume_texts_clean = preprocess_texts(resume_texts)
+    chunk_embeddings, starts, section_embeddings, rows, cols = _encode_resumes(
+        resume_texts, resume_texts_clean, RANKING_SECTIONS, batch_size=batch_size)
+    
+    per_resume = np.zeros((len(resume_texts), len(RANKING_SECTIONS), chunk_embeddings.shape[1]), dtype=np.float32)
+    mask = np.zeros((len(resume_texts), len(RANKING_SECTIONS)), dtype=bool)
+    if len(rows):
+        per_resume[rows, cols] = section_embeddings
+        mask[rows, cols] = True
+    return [
+        ResumeArtifacts(key, text, clean_text, segment_sections(text), chunk_embeddings[starts[row]:starts[row + 1]],
+                        per_resume[row], mask[row])
+        for row, (key, text, clean_text) in enumerate(zip(keys, resume_texts, resume_texts_clean))
+    ]
+
+def rank_resume_artifacts(job_description, artifacts, batch_size=64, job_profile=None):
+    """
+    Rank prebuilt ResumeArtifacts against a job description without touching the model.
+    
+    Only the job side (its cached JobProfile) and the similarities are
+    computed, so the result equals rank_resumes on the same texts; index ``i``
+    is ``artifacts[i]``.
+    """
+    if not (job_profile or job_description) or not artifacts:
+        return []
+    count('rank.resumes', len(artifacts))
+    job_profile = job_profile or get_job_profile(job_description, batch_size=batch_size)
+    job_embedding = job_profile.embedding
+    
+    with timer('keywords.match'):
+        keyword_scores = [
+            calculate_keyword_match_score(job_profile.keyword_tokens, item.text, weight=0.3,
+                                          term_index=build_term_index(item.clean_text))
+            for item in artifacts
+        ]
+    
+    # Same products as _model_scores, over the stored embeddings
+    chunk_embeddings = np.concatenate([item.chunk_embeddings for item in artifacts])
+    starts = np.cumsum([0] + [len(item.chunk_embeddings) for item in artifacts])
+    semantic_scores = pool_chunk_similarities(chunk_embeddings @ job_embedding, starts) * 100 * 0.4
+    mask = np.stack([item.section_mask for item in artifacts])
+    section_matrix = np.zeros(mask.shape, dtype=np.float32)
+    if mask.any():
+        found = np.concatenate([item.section_embeddings[item.section_mask] for item in artifacts])
+        section_matrix[mask] = found @ job_embedding * 100
+    section_avgs = section_matrix.mean(axis=1) * 0.3 if RANKING_SECTIONS else np.zeros(len(artifacts))
+    
+    total_scores = semantic_scores + section_avgs + keyword_scores
+    return _sort_scores(range(len(artifacts)), total_scores)
+
+def rank_resumes_stream(job_description, resume_texts, batch_size=64, top_k=10, job_profile=None):
+    """
+    Score resumes as they arrive and yield progress after every batch.
+    
+    ``resume_texts`` may be any iterable, e.g. a generator fed by PDF
+    extraction; resume ``i`` is the i-th text received. Each update is a dict
+    with ``processed`` (resumes scored so far), ``batch`` (the ``(score, index)``
+    pairs just scored) and ``top`` (the running top ``top_k``, best first).
+    Scores match rank_resumes, and only one batch of texts is held at a time.
+    """
+    if not (job_profile or job_description):
+        return
+    
+    # The job profile waits for the first batch so extraction can start while the model loads
+    top = []  # Min-heap of (score, -index) so the weakest of the top K is popped first
+    processed = 0
+    batch = []
+    
+    def score_batch():
+        nonlocal job_profile
+        if job_profile is None:
+            job_profile = get_job_profile(job_description, batch_size=batch_size)
+        count('rank.resumes', len(batch))
+        with timer('preprocess'):
+            clean = preprocess_texts(batch)
+        with timer('keywords.match'):
+            keyword_scores = [
+                calculate_keyword_match_score(job_profile.keyword_tokens, text, weight=0.3,
+                                              term_index=build_term_index(clean_text))
+                for text, clean_text in zip(batch, clean)
+            ]
+        scores = _model_scores(job_profile.embedding, batch, clean, batch_size) + keyword_scores
+        scored = [(score, processed + offset) for offset, score in enumerate(scores)]
+        for score, idx in scored:
+            entry = (score, -idx)
+            if len(top) < top_k:
+                heapq.heappush(top, entry)
+            elif entry > top[0]:
+                heapq.heapreplace(top, entry)
+        return scored
+    
+    for text in resume_texts:
+        batch.append(text)
+        if len(batch) >= batch_size:
+            scored = score_batch()
+            processed += len(batch)
+            batch = []
+            yield {'processed': processed, 'batch': scored, 'top': [(score, -neg) for score, neg in sorted(top, reverse=True)]}
+    
+    if batch:
+        scored = score_batch()
+        processed += len(batch)
+        yield {'processed': processed, 'batch': scored, 'top': [(score, -neg) for score, neg in sorted(top, reverse=True)]}
+
+def lexical_scores(job_desc_clean, resume_texts_clean, job_keywords, term_indexes):
+    """
+    Cheap model-free score for each resume on the same 0-100 scale as rank_resumes.
+    
+    Keyword matching keeps its 30% weight and TF-IDF cosine similarity stands
+    in for the 70% that the semantic and section scores would contribute. The
+    corpus keyword model's vectorizer is used when one has been fitted.
+    Returns ``(keyword_scores, lexical_scores)`` arrays.
+    """
+    with timer('keywords.match'):
+        keyword_scores = np.array([
+            calculate_keyword_match_score(job_keywords, clean_text, weight=0.3, term_index=term_index)
+            for clean_text, term_index in zip(resume_texts_clean, term_indexes)
+        ])
+    
+    with timer('cascade.tfidf'):
+        keyword_model = get_keyword_model()
+        documents = [job_desc_clean] + list(resume_texts_clean)
+        if keyword_model is not None and keyword_model.vectorizer is not None:
+            tfidf = keyword_model.transform(documents)
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            tfidf = TfidfVectorizer(stop_words='english').fit_transform(documents)
+        similarities = (tfidf[1:] @ tfidf[0].T).toarray().ravel()  # Rows are L2-normalized
+    
+    return keyword_scores, keyword_scores + similarities * 100 * 0.7
+
+def rank_resumes_cascade(job_description, resume_texts, top_m, batch_size=64, job_profile=None):
+    """
+    Two-stage ranking: lexical prefilter, then full scoring of the top M.
+    
+    Every resume gets a lexical score; only the ``top_m`` best go through
+    the embedding model. Returns ``(ranked, lexical_only)`` where ``ranked``
+    lists the fully scored resumes first, then the cut ones by lexical score,
+    and ``lexical_only`` is the set of indices whose score is lexical only.
+    """
+    if not (job_profile or job_description) or not resume_texts:
+        return [], set()
+    if top_m >= len(resume_texts):
+        return rank_resumes(job_description, resume_texts, batch_size=batch_size, job_profile=job_profile), set()
+    
+    count('rank.resumes', len(resume_texts))
+    job_profile = job_profile or get_job_profile(job_description, batch_size=batch_size)
+    with timer('preprocess'):
+        resume_texts_clean = preprocess_texts(resume_texts)
+    with timer('keywords.index'):
+        term_indexes = [build_term_index(text) for text in resume_texts_clean]
+    
+    # Stage one: lexical scores for everyone
+    keyword_scores, lexical = lexical_scores(job_profile.clean_text, resume_texts_clean, job_profile.keyword_tokens,
+                                             term_indexes)
+    order = np.argsort(-lexical, kind='stable')
+    shortlist = np.sort(order[:top_m])
+    cut = order[top_m:]
+    count('cascade.shortlisted', len(shortlist))
+    
+    # Stage two: semantic and section scoring on the shortlist only
+    model_scores = _model_scores(
+        job_profile.embedding,
+        [resume_texts[idx] for idx in shortlist],
+        [resume_texts_clean[idx] for idx in shortlist],
+        batch_size,
+    )
+    ranked = _sort_scores(shortlist.tolist(), model_scores + keyword_scores[shortlist])
+    ranked += [(float(lexical[idx]), int(idx)) for idx in cut]
+    return ranked, set(cut.tolist())
+
+def cascade_recall_report(job_description, resume_texts, top_m_values=(50, 100, 200, 500), k=10, batch_size=64):
+    """
+    Compare cascade rankings with full scoring on a benchmark set.
+    
+    For each M, reports recall@k (the share of the full ranking's top ``k``
+    that the cascade also puts in its top ``k``) and the fraction of resumes
+    that went through the embedding model.
+    """
+    full = rank_resumes(job_description, resume_texts, batch_size=batch_size)
+    full_top = {idx for _, idx in full[:k]}
+    report = []
+    for top_m in top_m_values:
+        ranked, lexical_only = rank_resumes_cascade(job_description, resume_texts, top_m, batch_size=batch_size)
+        cascade_top = {idx for _, idx in ranked[:k]}
+        report.append({
+            'top_m': top_m,
+            'k': k,
+            'recall_at_k': len(full_top & cascade_top) / len(full_top) if full_top else 1.0,
+            'scored_fraction': 1 - len(lexical_only) / len(resume_texts),
+        })
+    return report
+
+def open_resume_pool(pool_dir):
+    """
+    Return the ``(VectorIndex, TextCache)`` pair for a persistent resume pool.
+    
+    The index holds one embedding per resume and the text cache its raw text,
+    both keyed by the caller's resume id. Pools are opened once per process.
+    """
+    with _resume_pools_lock:
+        if pool_dir not in _resume_pools:
+            _resume_pools[pool_dir] = (
+                VectorIndex(os.path.join(pool_dir, 'index')),
+                TextCache(os.path.join(pool_dir, 'texts'), version=MODEL_NAME),
+            )
+        return _resume_pools[pool_dir]
+
+def add_resumes_to_pool(pool_dir, resume_ids, resume_texts, batch_size=64):
+    """Embed resumes and add them to the pool, replacing any with the same id."""
+    index, texts = open_resume_pool(pool_dir)
+    embeddings = encode_texts(preprocess_texts(resume_texts), batch_size=batch_size)
+    for resume_id, text in zip(resume_ids, resume_texts):
+        texts.put(_pool_key(resume_id), text)
+    index.add(list(resume_ids), embeddings)
+
+def remove_resumes_from_pool(pool_dir, resume_ids):
+    """Drop resumes from pool search results."""
+    index, _ = open_resume_pool(pool_dir)
+    index.delete(resume_ids)
+
+def _pool_key(resume_id):
+    # TextCache keys are used as file names, so hash arbitrary ids
+    return hashlib.sha256(resume_id.encode('utf-8')).hexdigest()
+
+def rank_resume_pool(job_description, pool_dir, top_k=200, nprobe=None, batch_size=64):
+    """
+    Rank a persistent resume pool against a job description.
+    
+    The pool's vector index retrieves the ``top_k`` nearest resumes by
+    semantic similarity, and only that shortlist goes through the full
+    rank_resumes scoring. Returns ``(score, resume_id)`` tuples, best first.
+    """
+    index, texts = open_resume_pool(pool_dir)
+    if not job_description or not len(index):
+        return []
+    job_profile = get_job_profile(job_description, batch_size=batch_size)
+    shortlist = [resume_id for _, resume_id in index.search(job_profile.embedding, k=top_k, nprobe=nprobe)]
+    
+    shortlist_texts = []
+    shortlist_ids = []
+    for resume_id in shortlist:
+        text = texts.get(_pool_key(resume_id))
+        if text is not None:
+            shortlist_ids.append(resume_id)
+            shortlist_texts.append(text)
+    
+    ranked = rank_resumes(job_description, shortlist_texts, batch_size=batch_size, job_profile=job_profile)
+    return [(score, shortlist_ids[idx]) for score, idx in ranked]
+
+load_timings['import'] = time.perf_counter() - _import_started
@@ -0,0 +1,208 @@
+"""
+Headless batch screening.
+
+Ranks a folder (or glob) of PDF resumes against a job description without the
+Streamlit UI, e.g. for scheduled overnight runs:
+
+    python screen_resumes.py job.txt resumes/ -o ranking.csv --workers 8
+    python screen_resumes.py job.txt "incoming/**/*.pdf" -o ranking.jsonl --checkpoint run.ckpt
+
+With ``--checkpoint`` every extracted file is appended to a JSONL checkpoint as
+soon as it finishes, so an interrupted run picks up where it stopped.
+
+``--pool DIR`` adds the screened resumes to a persistent talent pool. Run
+without resume arguments to query the pool directly; only the ``--top-k``
+nearest resumes are fully scored:
+
+    python screen_resumes.py job.txt --pool talent_pool/ --top-k 200 -o shortlist.csv
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+
+
+def find_pdfs(targets):
+    """Expand directories and glob patterns into a sorted list of PDF paths."""
+    paths = set()
+    for target in targets:
+        if os.path.isdir(target):
+            pattern = os.path.join(target, "**", "*.pdf")
+        else:
+            pattern = target
+        for path in glob.glob(pattern, recursive=True):
+            if path.lower().endswith(".pdf") and os.path.isfile(path):
+                paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+
+def load_checkpoint(path):
+    """Return ``{pdf_path: record}`` for every file already extracted in a previous run."""
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A partial last line from an interrupted run
+            done[record["path"]] = record
+    return done
+
+
+def extract_all(pdf_paths, workers, checkpoint_path, quiet=False):
+    """Extract text from every PDF, reusing and extending the checkpoint."""
+    from pdf_extraction import extract_texts_parallel
+
+    # Files that failed or timed out last time are retried rather than reused
+    done = {path: record for path, record in load_checkpoint(checkpoint_path).items() if not record.get("error")}
+    todo = [path for path in pdf_paths if path not in done]
+    if done and not quiet:
+        print(f"Resuming: {len(pdf_paths) - len(todo)} of {len(pdf_paths)} files already extracted",
+              file=sys.stderr)
+
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+    try:
+        # Paths are read by the extractor a few at a time, so the corpus is never all in memory
+        files = [(path, path) for path in todo]
+        for count, result in enumerate(extract_texts_parallel(files, max_workers=workers), start=1):
+            record = {"path": result.name, "text": result.text, "error": result.error}
+            done[result.name] = record
+            if checkpoint:
+                checkpoint.write(json.dumps(record) + "\n")
+                checkpoint.flush()
+            if not quiet:
+                status = f"error: {result.error}" if result.error else "ok"
+                print(f"[{count}/{len(files)}] {os.path.basename(result.name)} {status}", file=sys.stderr)
+    finally:
+        if checkpoint:
+            checkpoint.close()
+
+    return [done[path] for path in pdf_paths if path in done]
+
+
+def write_results(output, ranked, records, fmt, lexical_only=()):
+    """Stream ranked rows to CSV or JSONL, one row at a time."""
+    out = sys.stdout if output in (None, "-") else open(output, "w", encoding="utf-8", newline="")
+    try:
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["rank", "file", "score", "path", "lexical_only"])
+        for rank, (score, idx) in enumerate(ranked, start=1):
+            path = records[idx]["path"]
+            row = {"rank": rank, "file": os.path.basename(path), "score": round(float(score), 4), "path": path,
+                   "lexical_only": idx in lexical_only}
+            if fmt == "csv":
+                writer.writerow([row["rank"], row["file"], row["score"], row["path"], int(row["lexical_only"])])
+            else:
+                out.write(json.dumps(row) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Rank PDF resumes against a job description.")
+    parser.add_argument("job_description", help="Text file containing the job description")
+    parser.add_argument("resumes", nargs="*", help="Directories or glob patterns of PDF resumes")
+    parser.add_argument("-o", "--output", default="-", help="Output file (.csv or .jsonl); defaults to stdout")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Output format (inferred from --output)")
+    parser.add_argument("--workers", type=int, default=None, help="PDF extraction worker processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="Embedding batch size")
+    parser.add_argument("--checkpoint", help="JSONL checkpoint of extracted files, for resumable runs")
+    parser.add_argument("--pool", help="Talent pool directory: resumes are added to it, or queried if none are given")
+    parser.add_argument("--top-k", type=int, default=200, help="Pool candidates retrieved for full scoring")
+    parser.add_argument("--nprobe", type=int, default=None,
+                        help="Search only this many IVF partitions of the pool (approximate)")
+    parser.add_argument("--cascade", type=int, metavar="M", default=None,
+                        help="Only run semantic scoring on the top M resumes by lexical score")
+    parser.add_argument("--cascade-report", action="store_true",
+                        help="Print recall of cascade ranking against full scoring for several M")
+    parser.add_argument("--update-keyword-model", action="store_true",
+                        help="Fold this job description and these resumes into the corpus keyword model")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Append per-stage timings of this run to a JSONL file and print a breakdown")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.profile:
+        return screen(args)
+    from instrumentation import recording, format_summary
+    with recording("screen_resumes", log_path=args.profile) as recorder:
+        screen(args)
+    if not args.quiet:
+        print(format_summary(recorder), file=sys.stderr)
+
+
+def screen(args):
+    fmt = args.format or ("jsonl" if args.output.endswith((".jsonl", ".json")) else "csv")
+
+    with open(args.job_description, "r", encoding="utf-8") as f:
+        job_description = f.read()
+    if not job_description.strip():
+        sys.exit("Job description is empty")
+
+    if not args.resumes:
+        if not args.pool:
+            sys.exit("Give resume directories or globs, or a --pool to query")
+        from resume_processing import rank_resume_pool
+        pool_ranked = rank_resume_pool(job_description, args.pool, top_k=args.top_k, nprobe=args.nprobe,
+                                       batch_size=args.batch_size)
+        records = [{"path": resume_id} for _, resume_id in pool_ranked]
+        write_results(args.output, [(score, idx) for idx, (score, _) in enumerate(pool_ranked)], records, fmt)
+        if not args.quiet:
+            print(f"Ranked the top {len(records)} resumes from the pool", file=sys.stderr)
+        return
+
+    pdf_paths = find_pdfs(args.resumes)
+    if not pdf_paths:
+        sys.exit("No PDF files found")
+
+    records = extract_all(pdf_paths, args.workers, args.checkpoint, quiet=args.quiet)
+    failed = [record for record in records if record["error"]]
+    records = [record for record in records if not record["error"]]
+    for record in failed:
+        print(f"Skipped {record['path']}: {record['error']}", file=sys.stderr)
+    if not records:
+        sys.exit("No resumes could be extracted")
+
+    # Imported here so argument errors and --help stay instant
+    from resume_processing import (rank_resumes, rank_resumes_cascade, cascade_recall_report, load_timings,
+                                   update_keyword_model, add_resumes_to_pool)
+
+    resume_texts = [record["text"] for record in records]
+    if args.pool:
+        add_resumes_to_pool(args.pool, [record["path"] for record in records], resume_texts,
+                            batch_size=args.batch_size)
+    if args.update_keyword_model:
+        keyword_model = update_keyword_model([job_description] + resume_texts)
+        if not args.quiet:
+            print(f"Keyword model now covers {keyword_model.n_docs} documents", file=sys.stderr)
+
+    if args.cascade_report:
+        top_m_values = sorted({50, 100, 200, 500} | ({args.cascade} if args.cascade else set()))
+        for row in cascade_recall_report(job_description, resume_texts, top_m_values, batch_size=args.batch_size):
+            print(f"M={row['top_m']:<6} recall@{row['k']}={row['recall_at_k']:.2f} "
+                  f"semantically scored={row['scored_fraction']:.0%}", file=sys.stderr)
+
+    lexical_only = set()
+    if args.cascade:
+        ranked, lexical_only = rank_resumes_cascade(job_description, resume_texts, args.cascade,
+                                                    batch_size=args.batch_size)
+    else:
+        ranked = rank_resumes(job_description, resume_texts, batch_size=args.batch_size)
+    write_results(args.output, ranked, records, fmt, lexical_only)
+    if not args.quiet:
+        print(f"Ranked {len(ranked)} resumes ({len(failed)} skipped)", file=sys.stderr)
+        print("Load times: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in load_timings.items()),
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
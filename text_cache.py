@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+
+# Persistent cache of extracted PDF text keyed by the SHA-256 of the file bytes.
+#
+# Each entry is a zlib-compressed JSON document holding the text and the
+# extractor version that produced it. Entries written by a different extractor
+# version are treated as stale and removed on lookup.
+
+
+def hash_bytes(data):
+    """Return the SHA-256 hex digest of raw file bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class TextCache:
+    """
+    On-disk cache of extracted text, one compressed file per document.
+
+    ``version`` identifies the extractor (e.g. ``"pdfplumber-0.11.0"``); bump it
+    and old entries stop matching. ``hits``, ``misses`` and ``stale`` count
+    lookups since the cache was opened. The entry count and size reported by
+    ``stats`` come from one directory scan kept up to date by this instance's
+    own writes; ``stats(refresh=True)`` rescans to pick up other processes.
+    """
+
+    def __init__(self, cache_dir, version):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._entries = None  # Entry count and total bytes, once scanned
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, digest):
+        # Fan out into subdirectories so no single directory gets huge
+        return os.path.join(self.cache_dir, digest[:2], digest + ".json.z")
+
+    def get(self, digest):
+        """Return the cached text for a file hash, or None on a miss."""
+        path = self._path(digest)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(zlib.decompress(f.read()).decode("utf-8"))
+        except (OSError, ValueError, zlib.error):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if entry.get("version") != self.version:
+            with self._lock:
+                self.stale += 1
+                self.misses += 1
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                pass
+            else:
+                self._account(-1, -size)
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry["text"]
+
+    def put(self, digest, text):
+        """Store the extracted text for a file hash."""
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = zlib.compress(json.dumps({"version": self.version, "text": text}).encode("utf-8"), 6)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = None
+        os.replace(tmp_path, path)
+        self._account(replaced is None, len(payload) - (replaced or 0))
+
+    def _account(self, entries, size):
+        with self._lock:
+            if self._entries is not None:
+                self._entries += entries
+                self._bytes += size
+
+    def _scan(self):
+        entries = 0
+        size = 0
+        if os.path.isdir(self.cache_dir):
+            for root, _, names in os.walk(self.cache_dir):
+                for name in names:
+                    if name.endswith(".json.z"):
+                        entries += 1
+                        size += os.path.getsize(os.path.join(root, name))
+        with self._lock:
+            self._entries = entries
+            self._bytes = size
+
+    def stats(self, refresh=False):
+        """Return lookup counters plus the number and total size of stored entries."""
+        if refresh or self._entries is None:
+            self._scan()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._entries,
+            "bytes": self._bytes,
+        }
@@ -0,0 +1,335 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+# Persistent vector index over the resume pool.
+#
+# Embeddings are rows of a float32 memory-mapped matrix; search is an exact
+# brute-force dot product over the live rows (the vectors are L2-normalized, so
+# this is cosine similarity). An optional IVF partitioning built with k-means
+# restricts a search to the rows of the closest clusters.
+#
+# Writers never modify data a reader might be using: new rows go past the
+# count a reader snapshotted, deletes and rebuilds publish new generation files
+# and swap them in under a lock, so searches keep running during maintenance.
+# Several processes may share one index directory: every write holds an
+# exclusive file lock and starts from the latest published manifest.
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "index.lock"
+
+
+class VectorIndex:
+    """
+    Top-K similarity index keyed by string ids.
+
+    ``add`` appends (or replaces) vectors, ``delete`` tombstones them,
+    ``compact`` rewrites the matrix without deleted rows and ``build_ivf``
+    partitions it for approximate search. Everything is persisted under
+    ``index_dir``.
+    """
+
+    def __init__(self, index_dir, dim=None, initial_capacity=1024):
+        self.index_dir = index_dir
+        self.dim = int(dim) if dim else None
+        self.initial_capacity = initial_capacity
+        self._write_lock = threading.Lock()
+        self._state = None  # Immutable snapshot, replaced wholesale by writers
+        self._manifest = None  # Manifest the snapshot was loaded from or published as
+        if os.path.exists(self._path(MANIFEST_FILE)):
+            with self._file_lock(shared=True):
+                self._load()
+
+    # -- persistence ---------------------------------------------------------
+
+    def _path(self, name):
+        return os.path.join(self.index_dir, name)
+
+    @contextmanager
+    def _file_lock(self, shared=False):
+        """Hold the index's lock file, exclusively for writers and shared for loads."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self._path(LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_manifest(self):
+        try:
+            with open(self._path(MANIFEST_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        """Reload if another process published since this snapshot; call with the file lock held."""
+        if self._read_manifest() != self._manifest:
+            self._load()
+
+    def _load(self):
+        manifest = self._read_manifest()
+        if manifest is None:
+            return
+        with open(self._path(manifest["ids_file"]), "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        self.dim = manifest["dim"]
+        vectors = np.load(self._path(manifest["vectors_file"]), mmap_mode="r+")
+        deleted = np.zeros(vectors.shape[0], dtype=bool)
+        deleted[manifest["deleted"]] = True
+        assignments = centroids = None
+        if manifest.get("ivf_file"):
+            ivf = np.load(self._path(manifest["ivf_file"]))
+            centroids = ivf["centroids"]
+            assignments = np.full(vectors.shape[0], -1, dtype=np.int32)
+            assignments[:len(ivf["assignments"])] = ivf["assignments"]
+        self._state = self._make_state(manifest["generation"], vectors, ids, deleted, centroids, assignments)
+        self._manifest = manifest
+
+    def _make_state(self, generation, vectors, ids, deleted, centroids=None, assignments=None):
+        return {
+            "generation": generation,
+            "vectors": vectors,
+            "count": len(ids),
+            "ids": ids,
+            "row_by_id": {resume_id: row for row, resume_id in enumerate(ids) if not deleted[row]},
+            "deleted": deleted,
+            "centroids": centroids,
+            "assignments": assignments,
+        }
+
+    def _publish(self, state, vectors_file, ivf_file=None):
+        """Persist a new snapshot and make it the one searches use."""
+        generation = state["generation"]
+        ids_file = f"ids-{generation}.json"
+        tmp_path = self._path(ids_file + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state["ids"], f)
+        os.replace(tmp_path, self._path(ids_file))
+
+        state["vectors"].flush()
+        if state["centroids"] is not None and ivf_file is None:
+            ivf_file = f"ivf-{generation}.npz"
+            tmp_path = self._path(ivf_file + ".tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, centroids=state["centroids"], assignments=state["assignments"][:state["count"]])
+            os.replace(tmp_path, self._path(ivf_file))
+        manifest = {
+            "version": (self._manifest or {}).get("version", 0) + 1,  # Lets other processes spot every write
+            "generation": generation,
+            "dim": self.dim,
+            "vectors_file": vectors_file,
+            "ids_file": ids_file,
+            "ivf_file": ivf_file,
+            "deleted": np.flatnonzero(state["deleted"][:state["count"]]).tolist(),
+        }
+        tmp_path = self._path(MANIFEST_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._path(MANIFEST_FILE))
+
+        self._state = state
+        self._manifest = manifest
+        self._remove_stale_files(generation)
+
+    def _remove_stale_files(self, generation):
+        """Delete files of generations older than ``generation``, which no manifest can reference any more."""
+        for name in os.listdir(self.index_dir):
+            kind, _, rest = name.partition("-")
+            if kind not in ("vectors", "ids", "ivf"):
+                continue
+            try:
+                stale = int(rest.split(".")[0]) < generation
+            except ValueError:
+                continue
+            if stale:
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _vectors_file(generation):
+        return f"vectors-{generation}.npy"
+
+    def _new_matrix(self, generation, capacity):
+        os.makedirs(self.index_dir, exist_ok=True)
+        return np.lib.format.open_memmap(
+            self._path(self._vectors_file(generation)), mode="w+", dtype=np.float32, shape=(capacity, self.dim)
+        )
+
+    # -- writes --------------------------------------------------------------
+
+    def add(self, ids, vectors):
+        """
+        Add vectors under the given ids; an id that already exists is replaced.
+        An id repeated within one call keeps its last vector.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        ids = list(ids)
+        if not ids:
+            return
+        last = {resume_id: pos for pos, resume_id in enumerate(ids)}
+        if len(last) < len(ids):
+            keep = sorted(last.values())
+            ids = [ids[pos] for pos in keep]
+            vectors = vectors[keep]
+        with self._write_lock, self._file_lock():
+            self._refresh()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            state = self._state
+            if state is None:
+                generation = 1
+                matrix = self._new_matrix(generation, max(self.initial_capacity, len(ids)))
+                state = self._make_state(generation, matrix, [], np.zeros(matrix.shape[0], dtype=bool))
+
+            count = state["count"]
+            generation = state["generation"]
+            matrix = state["vectors"]
+            deleted = state["deleted"].copy()
+            assignments = state["assignments"]
+            if count + len(ids) > matrix.shape[0]:
+                # Grow into a new generation file; the old one stays valid for running searches
+                generation += 1
+                capacity = max(matrix.shape[0] * 2, count + len(ids))
+                grown = self._new_matrix(generation, capacity)
+                grown[:count] = matrix[:count]
+                matrix = grown
+                deleted = np.concatenate([deleted, np.zeros(capacity - len(deleted), dtype=bool)])
+                if assignments is not None:
+                    assignments = np.concatenate([assignments, np.full(capacity - len(assignments), -1, np.int32)])
+            elif assignments is not None:
+                assignments = assignments.copy()
+
+            # Rows past the published count are invisible to readers, so writing them is safe
+            matrix[count:count + len(ids)] = vectors
+            for resume_id in ids:
+                row = state["row_by_id"].get(resume_id)
+                if row is not None:
+                    deleted[row] = True
+            if assignments is not None:
+                assignments[count:count + len(ids)] = np.argmax(vectors @ state["centroids"].T, axis=1)
+
+            new_state = self._make_state(generation, matrix, state["ids"] + ids, deleted,
+                                         state["centroids"], assignments)
+            self._publish(new_state, self._vectors_file(generation))
+
+    def delete(self, ids):
+        """Remove ids from search results; space is reclaimed by ``compact``."""
+        with self._write_lock, self._file_lock():
+            self._refresh()
+            state = self._state
+            if state is None:
+                return
+            deleted = state["deleted"].copy()
+            for resume_id in ids:
+                row = state["row_by_id"].get(resume_id)
+                if row is not None:
+                    deleted[row] = True
+            new_state = self._make_state(state["generation"], state["vectors"], state["ids"], deleted,
+                                         state["centroids"], state["assignments"])
+            self._publish(new_state, self._vectors_file(state["generation"]))
+
+    def compact(self):
+        """Rewrite the index without deleted rows, as a new generation."""
+        with self._write_lock, self._file_lock():
+            self._refresh()
+            state = self._state
+            if state is None:
+                return
+            live = np.flatnonzero(~state["deleted"][:state["count"]])
+            generation = state["generation"] + 1
+            matrix = self._new_matrix(generation, max(self.initial_capacity, len(live)))
+            matrix[:len(live)] = state["vectors"][live]
+            assignments = None
+            if state["assignments"] is not None:
+                assignments = np.full(matrix.shape[0], -1, dtype=np.int32)
+                assignments[:len(live)] = state["assignments"][live]
+            new_state = self._make_state(generation, matrix, [state["ids"][row] for row in live],
+                                         np.zeros(matrix.shape[0], dtype=bool), state["centroids"], assignments)
+            self._publish(new_state, self._vectors_file(generation))
+
+    def build_ivf(self, n_lists=None, random_state=0):
+        """
+        Partition the live vectors with k-means for approximate search.
+
+        ``n_lists`` defaults to about sqrt(N). Vectors added later are assigned
+        to their nearest centroid as they arrive.
+        """
+        from sklearn.cluster import MiniBatchKMeans
+
+        with self._write_lock, self._file_lock():
+            self._refresh()
+            state = self._state
+            if state is None or not len(state["row_by_id"]):
+                return
+            live = np.flatnonzero(~state["deleted"][:state["count"]])
+            n_lists = n_lists or max(1, int(np.sqrt(len(live))))
+            kmeans = MiniBatchKMeans(n_clusters=min(n_lists, len(live)), random_state=random_state, n_init=3)
+            kmeans.fit(state["vectors"][live])
+            centroids = kmeans.cluster_centers_.astype(np.float32)
+            assignments = np.full(state["vectors"].shape[0], -1, dtype=np.int32)
+            for start in range(0, state["count"], 65536):
+                stop = min(start + 65536, state["count"])
+                assignments[start:stop] = np.argmax(state["vectors"][start:stop] @ centroids.T, axis=1)
+            new_state = self._make_state(state["generation"], state["vectors"], state["ids"], state["deleted"],
+                                         centroids, assignments)
+            self._publish(new_state, self._vectors_file(state["generation"]))
+
+    # -- reads ---------------------------------------------------------------
+
+    def search(self, query, k=100, nprobe=None):
+        """
+        Return the top ``k`` ``(score, id)`` pairs for a normalized query vector.
+
+        With ``nprobe`` and a built IVF, only the rows of the ``nprobe``
+        closest partitions are scored; otherwise the search is exact.
+        """
+        state = self._state  # One snapshot for the whole search
+        if state is None or not state["count"]:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        count = state["count"]
+
+        if nprobe and state["centroids"] is not None:
+            probe = np.argsort(-(state["centroids"] @ query))[:nprobe]
+            rows = np.flatnonzero(np.isin(state["assignments"][:count], probe) & ~state["deleted"][:count])
+            scores = state["vectors"][rows] @ query
+        else:
+            rows = None
+            scores = state["vectors"][:count] @ query
+            scores[state["deleted"][:count]] = -np.inf
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results = []
+        for pos in top:
+            if not np.isfinite(scores[pos]):
+                break
+            row = rows[pos] if rows is not None else pos
+            results.append((float(scores[pos]), state["ids"][row]))
+        return results
+
+    def __contains__(self, resume_id):
+        state = self._state
+        return state is not None and resume_id in state["row_by_id"]
+
+    def __len__(self):
+        state = self._state
+        return len(state["row_by_id"]) if state is not None else 0